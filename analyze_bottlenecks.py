@@ -22,18 +22,25 @@ from eu5_agent.knowledge import EU5Knowledge
 class BottleneckAnalyzer:
     """Analyze and report performance bottlenecks."""
 
+    # Sort rank per severity label (lower ranks are reported first)
+    SEVERITY_RANKS = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
+
     def __init__(self):
-        self.issues = []
+        # Issues are stored column-wise: entry i of each list describes issue i
+        self.issue_severities = []
+        self.issue_ranks = []
+        self.issue_areas = []
+        self.issue_descriptions = []
+        self.issue_recommendations = []
         self.recommendations = []
 
     def add_issue(self, severity: str, area: str, description: str, recommendation: str):
         """Add a performance issue."""
-        self.issues.append({
-            "severity": severity,
-            "area": area,
-            "description": description,
-            "recommendation": recommendation
-        })
+        self.issue_severities.append(severity)
+        self.issue_ranks.append(self.SEVERITY_RANKS[severity])
+        self.issue_areas.append(area)
+        self.issue_descriptions.append(description)
+        self.issue_recommendations.append(recommendation)
 
     def analyze_path_operations(self):
         """Analyze pathlib usage in knowledge loading."""
@@ -147,7 +154,7 @@ class BottleneckAnalyzer:
         print("ANALYZING: JSON Parsing in Tool Execution")
         print("="*70)
 
-        import json
+        from eu5_agent.agent import _json_loads
 
         # Simulate tool call argument parsing
         test_args = '{"category": "mechanics", "subcategory": "economy"}'
@@ -157,7 +164,25 @@ class BottleneckAnalyzer:
             json.loads(test_args)
         elapsed = (time.perf_counter() - start) * 1000
 
-        print(f"JSON parsing 10,000 times: {elapsed:.2f}ms")
+        print(f"JSON parsing 10,000 times (stdlib json): {elapsed:.2f}ms")
+        print(f"Average: {elapsed/10000:.4f}ms per parse")
+
+        # Reusing one decoder skips json.loads' per-call argument handling
+        decode = json.JSONDecoder().decode
+        start = time.perf_counter()
+        for _ in range(10000):
+            decode(test_args)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"JSON parsing 10,000 times (reused JSONDecoder): {elapsed:.2f}ms")
+        print(f"Average: {elapsed/10000:.4f}ms per parse")
+
+        start = time.perf_counter()
+        for _ in range(10000):
+            _json_loads(test_args)
+        elapsed = (time.perf_counter() - start) * 1000
+
+        print(f"JSON parsing 10,000 times (agent parser, {_json_loads.__module__}): {elapsed:.2f}ms")
         print(f"Average: {elapsed/10000:.4f}ms per parse")
         print("✓ JSON parsing overhead is negligible")
 
@@ -235,30 +260,28 @@ class BottleneckAnalyzer:
 
     def generate_report(self):
         """Generate final bottleneck report."""
-        print("\n" + "="*70)
-        print("BOTTLENECK ANALYSIS REPORT")
-        print("="*70)
+        out = ["", "=" * 70, "BOTTLENECK ANALYSIS REPORT", "=" * 70]
 
-        if not self.issues:
-            print("\n✓ No significant performance bottlenecks found!")
-            print("  The codebase is well-optimized for its use case.")
-            return
+        if not self.issue_severities:
+            out.append("")
+            out.append("✓ No significant performance bottlenecks found!")
+            out.append("  The codebase is well-optimized for its use case.")
+        else:
+            # Sort issue indices by the integer severity rank stored in add_issue
+            severities = self.issue_severities
+            order = sorted(range(len(severities)), key=self.issue_ranks.__getitem__)
 
-        # Sort by severity
-        severity_order = {"HIGH": 0, "MEDIUM": 1, "LOW": 2}
-        sorted_issues = sorted(self.issues, key=lambda x: severity_order[x["severity"]])
+            for i in order:
+                out.append("")
+                out.append(f"[{severities[i]}] {self.issue_areas[i]}")
+                out.append(f"  Issue: {self.issue_descriptions[i]}")
+                out.append(f"  → Recommendation: {self.issue_recommendations[i]}")
 
-        for issue in sorted_issues:
-            print(f"\n[{issue['severity']}] {issue['area']}")
-            print(f"  Issue: {issue['description']}")
-            print(f"  → Recommendation: {issue['recommendation']}")
+        # Emit the whole report with a single write
+        sys.stdout.write("\n".join(out) + "\n")
 
     def generate_optimization_summary(self):
         """Generate optimization recommendations."""
-        print("\n" + "="*70)
-        print("OPTIMIZATION OPPORTUNITIES")
-        print("="*70)
-
         optimizations = [
             {
                 "priority": "HIGH",
@@ -292,12 +315,16 @@ class BottleneckAnalyzer:
             }
         ]
 
+        out = ["", "=" * 70, "OPTIMIZATION OPPORTUNITIES", "=" * 70]
         for opt in optimizations:
-            print(f"\n[{opt['priority']}] {opt['title']}")
-            print(f"  {opt['description']}")
-            print("  Actions:")
-            for action in opt["actions"]:
-                print(f"    • {action}")
+            out.append("")
+            out.append(f"[{opt['priority']}] {opt['title']}")
+            out.append(f"  {opt['description']}")
+            out.append("  Actions:")
+            out.extend(f"    • {action}" for action in opt["actions"])
+
+        # Emit the whole summary with a single write
+        sys.stdout.write("\n".join(out) + "\n")
 
 
 def main():
@@ -306,14 +333,21 @@ def main():
     print("EU5 Strategy Agent - Deep Bottleneck Analysis")
     print("="*70)
 
-    # Run all analyses
-    analyzer.analyze_path_operations()
-    analyzer.analyze_cache_efficiency()
-    analyzer.analyze_message_trimming_algorithm()
-    analyzer.analyze_json_parsing()
-    analyzer.analyze_file_io()
-    analyzer.analyze_system_bottlenecks()
-    analyzer.analyze_openai_api_mock()
+    # Run all analyses. Phases run one at a time on purpose: most are
+    # CPU-bound timing loops that would skew each other's numbers if run
+    # concurrently, and the cache and file I/O phases clear the shared
+    # module-level caches.
+    phases = [
+        analyzer.analyze_path_operations,
+        analyzer.analyze_cache_efficiency,
+        analyzer.analyze_message_trimming_algorithm,
+        analyzer.analyze_json_parsing,
+        analyzer.analyze_file_io,
+        analyzer.analyze_system_bottlenecks,
+        analyzer.analyze_openai_api_mock,
+    ]
+    for phase in phases:
+        phase()
 
     # Generate reports
     analyzer.generate_report()
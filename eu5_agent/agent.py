@@ -5,29 +5,292 @@ Main agent implementation using OpenAI API with function calling.
 Integrates knowledge base and web search tools.
 """
 
+import asyncio
+import functools
+import hashlib
+import itertools
 import json
 import logging
+import math
 import re
-from typing import List, Optional, cast
-
-from openai import OpenAI
-from openai.types.chat import ChatCompletionMessageParam
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from typing import TYPE_CHECKING, Any, Self, cast
 
+from .cache import response_cache
 from .config import get_config, EU5Config
 from .knowledge import EU5Knowledge
 from .prompts import SYSTEM_PROMPT, TOOLS
 
+# The OpenAI SDK (with pydantic and httpx) takes ~0.4s to import, so it is
+# loaded when the first agent is created rather than with this module.
+# ChatCompletionMessageParam is only used for typing; at runtime history
+# entries are plain dicts.
+if TYPE_CHECKING:
+    from openai import OpenAI as _OpenAI
+    from openai.types.chat import ChatCompletionMessageParam
+else:
+    ChatCompletionMessageParam = dict
+
+# The OpenAI client class, set by _load_openai() on first use; tests patch
+# it before building an agent
+OpenAI: "type[_OpenAI] | None" = None
+
+
+def _load_openai() -> "type[_OpenAI]":
+    """Return the OpenAI client class, importing the SDK on first use."""
+    global OpenAI
+    if OpenAI is None:
+        from openai import OpenAI as client_class
+
+        OpenAI = client_class
+    return OpenAI
+
+
+# Use orjson for tool-argument decoding when available (faster on the small
+# payloads the model sends); fall back to the stdlib parser otherwise.
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers can keep
+# catching the stdlib exception type. The stdlib fallback calls a reused
+# decoder's decode() directly, skipping json.loads' per-call argument checks
+# (tool arguments are always str).
+# _json_dumps_sorted produces canonical (sorted-key) bytes for hashing request
+# payloads; it only has to be stable within one process, not match the stdlib
+# output byte for byte.
+_json_loads: Callable[[str], Any]
+_json_dumps_sorted: Callable[[Any], bytes]
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+
+    def _json_dumps_sorted(obj: Any) -> bytes:
+        return orjson.dumps(
+            obj, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+except ImportError:  # pragma: no cover - depends on optional dependency
+    _json_loads = json.JSONDecoder().decode
+
+    def _json_dumps_sorted(obj: Any) -> bytes:
+        return json.dumps(obj, sort_keys=True, default=str).encode("utf-8")
+
+# TOOLS never changes, so its share of the response cache key is serialized
+# once here instead of on every request
+_TOOLS_JSON = _json_dumps_sorted(TOOLS)
+
 # Set up logger for this module
 logger = logging.getLogger(__name__)
 
+
+def _install_fast_request_json() -> bool:
+    """
+    Serialize OpenAI request bodies with orjson when it is installed.
+
+    The SDK encodes every request body with a json.JSONEncoder subclass; with
+    long tool results in history that encode runs on each loop iteration.
+    orjson produces the same compact UTF-8 JSON several times faster. Anything
+    orjson rejects (e.g. pydantic models) falls back to the SDK encoder, as do
+    bodies with a NaN or infinite sampling parameter: orjson would write those
+    as null, where the SDK raises ValueError.
+
+    This replaces a module-level SDK function, so it affects every OpenAI
+    client in the process, not just the agent's; EU5Agent only calls it when
+    EU5_FAST_REQUEST_JSON is enabled. The hook point is SDK-internal, so this
+    is a no-op if orjson or the expected function is missing. Safe to call
+    repeatedly.
+
+    Returns:
+        True if the fast encoder is active
+    """
+    try:
+        import orjson
+        from openai import _base_client
+    except ImportError:  # pragma: no cover - depends on optional dependency
+        return False
+
+    original = getattr(_base_client, "openapi_dumps", None)
+    if original is None:
+        return False
+    if getattr(original, "__name__", "") == "_orjson_openapi_dumps":
+        return True
+
+    def _orjson_openapi_dumps(obj: Any) -> bytes:
+        # Floats only appear among the top-level request parameters
+        # (temperature, top_p, penalties); messages are strings
+        if isinstance(obj, dict) and any(
+            isinstance(value, float) and not math.isfinite(value) for value in obj.values()
+        ):
+            return cast(bytes, original(obj))
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            return cast(bytes, original(obj))
+
+    _base_client.openapi_dumps = _orjson_openapi_dumps
+    return True
+
+# Concurrent tool execution limits (several calls in one assistant turn)
+TOOL_MAX_WORKERS = 4
+TOOL_CALL_TIMEOUT = 30
+
+# Maximum model round trips per chat() call, to prevent infinite tool loops.
+# Set to 10 to allow complex queries requiring multiple tool calls
+# (web search + knowledge base lookups typically need 6-8 iterations)
+MAX_TOOL_ITERATIONS = 10
+
+# Appended to tool results cut by max_tool_result_chars
+TOOL_RESULT_TRUNCATION_NOTE = "\n\n[... truncated: result exceeded the tool output limit]"
+
+# Fast-path patterns for the argument shapes the model sends almost every
+# time. They only match flat objects whose string values contain no escapes,
+# so a match is always equivalent to a full JSON parse; anything else falls
+# back to _json_loads.
+_JSON_WS = r"[ \t\n\r]*"
+_QUERY_KNOWLEDGE_ARGS_PATTERN = re.compile(
+    rf'{_JSON_WS}\{{{_JSON_WS}"category"{_JSON_WS}:{_JSON_WS}"([\w-]*)"{_JSON_WS}'
+    rf'(?:,{_JSON_WS}"subcategory"{_JSON_WS}:{_JSON_WS}"([\w-]*)"{_JSON_WS})?\}}{_JSON_WS}'
+)
+_WEB_SEARCH_ARGS_PATTERN = re.compile(
+    rf'{_JSON_WS}\{{{_JSON_WS}"query"{_JSON_WS}:{_JSON_WS}"([^"\\\x00-\x1f]*)"{_JSON_WS}'
+    rf'(?:,{_JSON_WS}"num_results"{_JSON_WS}:{_JSON_WS}(0|[1-9][0-9]*){_JSON_WS})?\}}{_JSON_WS}'
+)
+
+
+def _parse_query_knowledge_args(raw: str) -> Any:
+    """Parse query_knowledge arguments, skipping the JSON parser when possible."""
+    match = _QUERY_KNOWLEDGE_ARGS_PATTERN.fullmatch(raw)
+    if match is None:
+        return _json_loads(raw)
+    category, subcategory = match.groups()
+    if subcategory is None:
+        return {"category": category}
+    return {"category": category, "subcategory": subcategory}
+
+
+def _parse_web_search_args(raw: str) -> Any:
+    """Parse web_search arguments, skipping the JSON parser when possible."""
+    match = _WEB_SEARCH_ARGS_PATTERN.fullmatch(raw)
+    if match is None:
+        return _json_loads(raw)
+    query, num_results = match.groups()
+    if num_results is None:
+        return {"query": query}
+    return {"query": query, "num_results": int(num_results)}
+
+
+_TOOL_ARG_PARSERS = {
+    "query_knowledge": _parse_query_knowledge_args,
+    "web_search": _parse_web_search_args,
+}
+
+
+def _parse_tool_arguments(function_name: str, raw: str) -> Any:
+    """Decode tool-call arguments using a per-tool fast path where available."""
+    if isinstance(raw, str):
+        parser = _TOOL_ARG_PARSERS.get(function_name)
+        if parser is not None:
+            return parser(raw)
+    return _json_loads(raw)
+
+
+def _assistant_message_to_dict(message: Any) -> dict[str, Any]:
+    """
+    Convert an SDK assistant message into the dict stored in history.
+
+    Builds the fields the API needs to replay the turn (role, content, tool
+    calls) directly, instead of running the full pydantic model_dump().
+    Provider-specific extras on the message and on each tool call (pydantic
+    ``model_extra``, e.g. Gemini's ``extra_content.google.thought_signature``,
+    which must be sent back on the next function-calling turn) are kept.
+    """
+    result: dict[str, Any] = {"role": "assistant", "content": message.content}
+    if message.tool_calls:
+        tool_calls = []
+        for tool_call in message.tool_calls:
+            tool_call_dict: dict[str, Any] = {
+                "id": tool_call.id,
+                "type": "function",
+                "function": {
+                    "name": tool_call.function.name,
+                    "arguments": tool_call.function.arguments,
+                },
+            }
+            tool_call_dict.update(getattr(tool_call, "model_extra", None) or {})
+            tool_calls.append(tool_call_dict)
+        result["tool_calls"] = tool_calls
+    result.update(getattr(message, "model_extra", None) or {})
+    return result
+
+
+def _validate_query_knowledge_args(arguments: Any) -> str | None:
+    """Return an error message if query_knowledge arguments are malformed."""
+    if not isinstance(arguments, dict) or "category" not in arguments:
+        return "Error: invalid tool arguments (missing 'category' for query_knowledge)"
+    if not isinstance(arguments.get("category"), str):
+        return "Error: invalid tool arguments ('category' must be a string)"
+    if arguments.get("subcategory") is not None and not isinstance(arguments.get("subcategory"), str):
+        return "Error: invalid tool arguments ('subcategory' must be a string if provided)"
+    return None
+
+
+def _validate_web_search_args(arguments: Any) -> str | None:
+    """Return an error message if web_search arguments are malformed."""
+    if not isinstance(arguments, dict) or "query" not in arguments:
+        return "Error: invalid tool arguments (missing 'query' for web_search)"
+    if not isinstance(arguments.get("query"), str):
+        return "Error: invalid tool arguments ('query' must be a string)"
+    if arguments.get("num_results") is not None and not isinstance(arguments.get("num_results"), int):
+        return "Error: invalid tool arguments ('num_results' must be an integer if provided)"
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _knowledge_tool_text(source: str, content: str) -> str:
+    """Tool output for a knowledge file, built once per file.
+
+    The content strings come from knowledge_cache, so repeat calls pass the
+    same str objects: their hashes are cached and equality is an identity
+    check, which makes a hit O(1) instead of copying multi-KB files again.
+    """
+    return f"**Source: Local Knowledge Base ({source})**\n\n{content}"
+
+
 # Complex-query detection tuning constants
-_COMPLEX_SEPARATOR_PATTERN = re.compile(r"\b(and|while|versus|vs\.?|with)\b")
 _COMPLEX_STRONG_SIGNALS = {
     "long-term", "long term", "campaign", "roadmap", "trade-off", "tradeoff",
     "optimize", "contingency", "fallback", "timeline", "5 year", "10 year",
     "15 year", "30 year",
 }
 _COMPLEX_WEAK_SIGNALS = {"plan", "risk", "if "}
+_COMPLEX_SIGNAL_WEIGHTS = {
+    **{s: 1 for s in _COMPLEX_WEAK_SIGNALS},
+    **{s: 2 for s in _COMPLEX_STRONG_SIGNALS},
+}
+# All signals in one pass. Signals are plain substrings (so "risks" counts as
+# "risk"); the zero-width lookahead reports a match at every position, so
+# overlapping signals such as "15 year" and "5 year" are both found.
+_COMPLEX_SIGNAL_PATTERN = re.compile(
+    "(?=(" + "|".join(
+        re.escape(s) for s in sorted(_COMPLEX_SIGNAL_WEIGHTS, key=len, reverse=True)
+    ) + "))"
+)
+# Conjunctions and clause punctuation, counted together
+_COMPLEX_STRUCTURE_PATTERN = re.compile(r"\b(?:and|while|versus|vs\.?|with)\b|[,;]")
+
+# Runtime guidance for complex queries, sent as a temporary system message.
+# Built once; it is only ever inserted into per-request lists, never into
+# the stored history.
+_COMPLEX_MODE_MESSAGE = cast(ChatCompletionMessageParam, {
+    "role": "system",
+    "content": (
+        "[Complex Query Mode Enabled]\n"
+        "Treat this as a campaign-level planning question. "
+        "If critical context is missing, ask up to 3 clarifying questions first. "
+        "Otherwise respond with: Situation Snapshot, Objectives (Short/Mid/Long), "
+        "Phased Plan (Immediate/5-year/10+ year), Risk Matrix, Pivot Triggers, "
+        "and First 3 Actions. Include conservative and aggressive alternatives."
+    ),
+})
 
 
 class EU5Agent:
@@ -42,10 +305,10 @@ class EU5Agent:
 
     def __init__(
         self,
-        api_key: Optional[str] = None,
-        model: Optional[str] = None,
-        knowledge_path: Optional[str] = None,
-        config: Optional[EU5Config] = None
+        api_key: str | None = None,
+        model: str | None = None,
+        knowledge_path: str | None = None,
+        config: EU5Config | None = None
     ):
         """
         Initialize the EU5 strategy agent.
@@ -71,10 +334,17 @@ class EU5Agent:
             )
 
         # Initialize OpenAI client with base_url from config
-        self.client = OpenAI(
+        self.client = _load_openai()(
             api_key=self.api_key,
             base_url=config.base_url
         )
+        if config.fast_request_json:
+            _install_fast_request_json()
+
+        # Response cache entries are scoped to the endpoint and credentials,
+        # so agents talking to different servers or accounts never share
+        # answers; hashed into every key by _response_cache_key()
+        self._response_cache_scope = _json_dumps_sorted([config.base_url, self.api_key])
 
         # Initialize knowledge base
         kb_path = knowledge_path or config.knowledge_path
@@ -83,17 +353,78 @@ class EU5Agent:
         # Store config reference for model-specific behavior
         self.config = config
         self.max_history_messages = config.max_history_messages
+        self.max_tool_result_chars = config.max_tool_result_chars
 
         # Initialize message history with proper OpenAI types
-        self.messages: List[ChatCompletionMessageParam] = []
+        self.messages: list[ChatCompletionMessageParam] = []
         self.reset()
 
+        # Incremental index of user-turn boundaries in self.messages, kept
+        # up to date by _user_turn_indices() and _trim_messages()
+        self._indexed_messages: Any = None
+        self._indexed_len = 0
+        self._user_turn_starts: deque[int] = deque()
+
+        # Thread pool for concurrent tool calls, created on first use
+        self._tool_executor: ThreadPoolExecutor | None = None
+
+        # Tool name -> (handler, argument validator); one dict lookup per call
+        self._tool_dispatch: dict[
+            str, tuple[Callable[..., str], Callable[[Any], str | None]]
+        ] = {
+            "query_knowledge": (self._query_knowledge, _validate_query_knowledge_args),
+            "web_search": (self._web_search, _validate_web_search_args),
+        }
+
+    def close(self):
+        """
+        Shut down the tool-call thread pool.
+
+        Queued calls are cancelled and running ones are not waited for. The
+        agent stays usable: the next batch of tool calls starts a new pool.
+        """
+        if self._tool_executor is not None:
+            self._tool_executor.shutdown(wait=False, cancel_futures=True)
+            self._tool_executor = None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
     def reset(self):
         """Reset the conversation history."""
         self.messages = [
             cast(ChatCompletionMessageParam, {"role": "system", "content": SYSTEM_PROMPT})
         ]
 
+    def _user_turn_indices(self) -> deque[int]:
+        """Return indices of user messages, scanning only messages added since the last call.
+
+        Boundaries are tracked incrementally for the current history object;
+        if history was replaced (reset() or direct assignment) or shrank,
+        the index is rebuilt from scratch.
+        """
+        messages = self.messages
+        if messages is not self._indexed_messages or len(messages) < self._indexed_len:
+            self._indexed_messages = messages
+            self._indexed_len = 0
+            self._user_turn_starts = deque()
+
+        total = len(messages)
+        new_count = total - self._indexed_len
+        if new_count:
+            # New messages are at the tail; walk back over just those
+            new_starts = [
+                total - 1 - offset
+                for offset, m in enumerate(itertools.islice(reversed(messages), new_count))
+                if m.get("role") == "user"
+            ]
+            self._user_turn_starts.extend(reversed(new_starts))
+            self._indexed_len = total
+        return self._user_turn_starts
+
     def _trim_messages(self):
         """Trim conversation history to stay within max_history_messages.
 
@@ -106,41 +437,39 @@ class EU5Agent:
             return
 
         # Find turn-group boundaries: indices where role == "user"
-        user_indices = [
-            i for i, m in enumerate(self.messages) if m.get("role") == "user"
-        ]
+        user_indices = self._user_turn_indices()
 
         if len(user_indices) <= 1:
             # Only one turn group (or none) — nothing safe to drop
             return
 
-        # Try dropping oldest turn groups until we're within the limit.
-        # Never drop the last turn group (the current question).
-        for cut in range(1, len(user_indices)):
-            # Keep system prompt + everything from user_indices[cut] onward
-            remaining = [self.messages[0]] + self.messages[user_indices[cut]:]
-            if len(remaining) <= self.max_history_messages:
-                dropped = len(self.messages) - len(remaining)
-                self.messages = remaining
-                logger.warning(
-                    "Trimmed %d old messages to stay within history limit (%d)",
-                    dropped,
-                    self.max_history_messages,
-                )
-                return
+        # Drop the oldest turn groups until we're within the limit. Never drop
+        # the last turn group (the current question); if even that isn't
+        # enough, keep only the last group to avoid unbounded growth.
+        total = len(self.messages)
+        keep_from = user_indices[-1]
+        for index in itertools.islice(user_indices, 1, None):
+            # Keep system prompt + everything from index onward
+            if 1 + total - index <= self.max_history_messages:
+                keep_from = index
+                break
+
+        # One in-place slice delete keeps the system prompt and the same list
+        # object, so the turn index stays attached to it
+        del self.messages[1:keep_from]
+
+        # Rebase the turn boundaries onto the trimmed history
+        dropped = keep_from - 1
+        self._user_turn_starts = deque(i - dropped for i in user_indices if i >= keep_from)
+        self._indexed_len = len(self.messages)
 
-        # Even dropping all but the last turn group isn't enough — do it anyway
-        # to avoid unbounded growth.
-        remaining = [self.messages[0]] + self.messages[user_indices[-1]:]
-        dropped = len(self.messages) - len(remaining)
-        self.messages = remaining
         logger.warning(
             "Trimmed %d old messages to stay within history limit (%d)",
-            dropped,
+            keep_from - 1,
             self.max_history_messages,
         )
 
-    def _query_knowledge(self, category: str, subcategory: Optional[str] = None) -> str:
+    def _query_knowledge(self, category: str, subcategory: str | None = None) -> str:
         """
         Tool function: Query the knowledge base.
 
@@ -151,10 +480,15 @@ class EU5Agent:
         Returns:
             Formatted knowledge content or error message
         """
-        result = self.knowledge.get_knowledge(category, subcategory)
+        return self._format_knowledge_result(
+            self.knowledge.get_knowledge(category, subcategory)
+        )
 
+    @staticmethod
+    def _format_knowledge_result(result: dict[str, Any]) -> str:
+        """Render a get_knowledge() result as tool output."""
         if result["status"] == "success":
-            return f"**Source: Local Knowledge Base ({result['source']})**\n\n{result['content']}"
+            return _knowledge_tool_text(result["source"], result["content"])
         elif result["status"] == "list":
             return result["content"]
         else:
@@ -179,15 +513,16 @@ class EU5Agent:
             if not results:
                 return f"No results found for: {query}"
 
-            output = f"**Source: Web Search** (Query: {query})\n\n"
+            # Collect parts and join once instead of growing a string
+            parts = [f"**Source: Web Search** (Query: {query})\n\n"]
             for i, result in enumerate(results, 1):
-                output += f"{i}. **{result['title']}**\n"
-                output += f"   URL: {result['url']}\n"
-                if result.get('snippet'):
-                    output += f"   {result['snippet']}\n"
-                output += "\n"
+                parts.append(f"{i}. **{result['title']}**\n   URL: {result['url']}\n")
+                snippet = result.get('snippet')
+                if snippet:
+                    parts.append(f"   {snippet}\n")
+                parts.append("\n")
 
-            return output
+            return "".join(parts)
 
         except Exception as e:
             return f"Web search error: {str(e)}"
@@ -206,84 +541,161 @@ class EU5Agent:
         function_name = tool_call.function.name  # type: ignore[attr-defined]
 
         try:
-            arguments = json.loads(tool_call.function.arguments)  # type: ignore[attr-defined]
+            arguments = _parse_tool_arguments(
+                function_name, tool_call.function.arguments  # type: ignore[attr-defined]
+            )
         except json.JSONDecodeError as exc:
             return f"Error: invalid tool arguments (JSON decode failed: {exc})"
 
-        # Basic validation per tool to avoid KeyError and provide clear errors
-        if function_name == "query_knowledge":
-            if not isinstance(arguments, dict) or "category" not in arguments:
-                return "Error: invalid tool arguments (missing 'category' for query_knowledge)"
-            if not isinstance(arguments.get("category"), str):
-                return "Error: invalid tool arguments ('category' must be a string)"
-            if arguments.get("subcategory") is not None and not isinstance(arguments.get("subcategory"), str):
-                return "Error: invalid tool arguments ('subcategory' must be a string if provided)"
-            return self._query_knowledge(**arguments)
-        elif function_name == "web_search":
-            if not isinstance(arguments, dict) or "query" not in arguments:
-                return "Error: invalid tool arguments (missing 'query' for web_search)"
-            if not isinstance(arguments.get("query"), str):
-                return "Error: invalid tool arguments ('query' must be a string)"
-            if arguments.get("num_results") is not None and not isinstance(arguments.get("num_results"), int):
-                return "Error: invalid tool arguments ('num_results' must be an integer if provided)"
-            return self._web_search(**arguments)
-        else:
+        entry = self._tool_dispatch.get(function_name)
+        if entry is None:
             return f"Unknown tool: {function_name}"
 
+        # Basic validation per tool to avoid KeyError and provide clear errors
+        handler, validate = entry
+        error = validate(arguments)
+        if error is not None:
+            return error
+        return handler(**arguments)
+
+    def _bound_tool_result(self, tool_result: str) -> str:
+        """Truncate a tool result to max_tool_result_chars before it enters history.
+
+        History is re-sent on every later API call, so one oversized result
+        would be paid for again on each iteration.
+        """
+        limit = self.max_tool_result_chars
+        if limit <= 0 or len(tool_result) <= limit:
+            return tool_result
+        logger.warning(
+            "Truncated tool result from %d to %d characters", len(tool_result), limit
+        )
+        return tool_result[:limit] + TOOL_RESULT_TRUNCATION_NOTE
+
+    @staticmethod
+    def _knowledge_request(tool_call) -> tuple[str, str | None] | None:
+        """Return (category, subcategory) for a well-formed query_knowledge call, else None.
+
+        Anything malformed returns None so it takes the regular
+        _execute_tool_call path and gets the usual error message.
+        """
+        # Type checker has incomplete stubs for tool_call.function
+        if tool_call.function.name != "query_knowledge":  # type: ignore[attr-defined]
+            return None
+        try:
+            arguments = _parse_tool_arguments(
+                "query_knowledge", tool_call.function.arguments  # type: ignore[attr-defined]
+            )
+        except json.JSONDecodeError:
+            return None
+        if _validate_query_knowledge_args(arguments) is not None:
+            return None
+        if not arguments.keys() <= {"category", "subcategory"}:
+            return None
+        return arguments["category"], arguments.get("subcategory")
+
+    def _execute_tool_calls(self, tool_calls) -> list[str]:
+        """
+        Execute a batch of tool calls, returning results in request order.
+
+        The model emits independent calls in one turn. Identical calls run
+        once. Knowledge base lookups are resolved together in one
+        deduplicated get_knowledge_batch() call. The remaining calls run on a
+        small thread pool, so network-bound web searches overlap instead of
+        queuing. A single call runs inline.
+        """
+        if len(tool_calls) == 1:
+            return [self._execute_tool_call(tool_calls[0])]
+
+        # Type checker has incomplete stubs for tool_call.function
+        keys = [
+            (tool_call.function.name, tool_call.function.arguments)  # type: ignore[attr-defined]
+            for tool_call in tool_calls
+        ]
+        unique_calls = dict(zip(keys, tool_calls))
+
+        knowledge_requests = {}
+        futures = {}
+        for key, tool_call in unique_calls.items():
+            request = self._knowledge_request(tool_call)
+            if request is not None:
+                knowledge_requests[key] = request
+                continue
+            if self._tool_executor is None:
+                self._tool_executor = ThreadPoolExecutor(
+                    max_workers=TOOL_MAX_WORKERS, thread_name_prefix="eu5-tool"
+                )
+            futures[key] = self._tool_executor.submit(self._execute_tool_call, tool_call)
+
+        # Local lookups run while any submitted calls are in flight
+        outputs: dict[tuple[str, str], str] = {}
+        if knowledge_requests:
+            batch = self.knowledge.get_knowledge_batch(knowledge_requests.values())
+            for key, request in knowledge_requests.items():
+                outputs[key] = self._format_knowledge_result(batch[request])
+
+        # One deadline for the whole batch, not TOOL_CALL_TIMEOUT per call
+        if futures:
+            wait_futures(futures.values(), timeout=TOOL_CALL_TIMEOUT)
+        for key, future in futures.items():
+            if future.done():
+                outputs[key] = future.result()
+            else:
+                # Drop it if it never started; a running call is abandoned
+                future.cancel()
+                outputs[key] = f"Error: tool '{key[0]}' timed out after {TOOL_CALL_TIMEOUT}s"
+
+        return [outputs[key] for key in keys]
+
     @staticmethod
+    @functools.lru_cache(maxsize=256)
     def _is_complex_query(user_message: str) -> bool:
         """Heuristic to identify multi-constraint or long-horizon requests."""
         lower = user_message.lower()
 
-        strong_signal_count = sum(1 for s in _COMPLEX_STRONG_SIGNALS if s in lower)
-        weak_signal_count = sum(1 for s in _COMPLEX_WEAK_SIGNALS if s in lower)
-        separators = len(_COMPLEX_SEPARATOR_PATTERN.findall(lower))
-        punctuation_split = lower.count(",") + lower.count(";")
-        long_message = len(lower.split()) >= 30
+        # Each distinct signal counts once: strong signals weigh 2, weak 1
+        signals = {m.group(1) for m in _COMPLEX_SIGNAL_PATTERN.finditer(lower)}
+        signal_score = sum(_COMPLEX_SIGNAL_WEIGHTS[s] for s in signals)
 
         # Avoid over-triggering from structure words/punctuation alone.
         # We only treat separators/punctuation as boosters once at least one
         # planning-oriented signal is present.
-        signal_score = strong_signal_count * 2 + weak_signal_count
-        structure_score = separators + punctuation_split
-
         if signal_score == 0:
             return False
 
-        if signal_score + structure_score >= 3:
+        if signal_score >= 3:
             return True
-        if long_message:
+        structure_score = sum(1 for _ in _COMPLEX_STRUCTURE_PATTERN.finditer(lower))
+        if signal_score + structure_score >= 3:
             return True
-        return False
-
-    @staticmethod
-    def _complex_mode_instruction() -> str:
-        """Runtime instruction injected as a temporary system message."""
-        return (
-            "[Complex Query Mode Enabled]\n"
-            "Treat this as a campaign-level planning question. "
-            "If critical context is missing, ask up to 3 clarifying questions first. "
-            "Otherwise respond with: Situation Snapshot, Objectives (Short/Mid/Long), "
-            "Phased Plan (Immediate/5-year/10+ year), Risk Matrix, Pivot Triggers, "
-            "and First 3 Actions. Include conservative and aggressive alternatives."
-        )
+        return len(lower.split()) >= 30
 
-    def _build_request_messages(self, is_complex_query: bool) -> List[ChatCompletionMessageParam]:
+    def _build_request_messages(self, is_complex_query: bool) -> list[ChatCompletionMessageParam]:
         """Build request message list, injecting complex-mode guidance when needed."""
-        request_messages: List[ChatCompletionMessageParam] = list(self.messages)
+        # One shallow copy: history keeps growing after the request is sent
+        request_messages: list[ChatCompletionMessageParam] = list(self.messages)
         if not is_complex_query:
             return request_messages
 
-        complex_mode_message = cast(ChatCompletionMessageParam, {
-            "role": "system",
-            "content": self._complex_mode_instruction(),
-        })
-
         if request_messages and request_messages[0].get("role") == "system":
-            return [request_messages[0], complex_mode_message, *request_messages[1:]]
+            request_messages.insert(1, _COMPLEX_MODE_MESSAGE)
+        else:
+            # Defensive fallback: if history is ever malformed, prepend instructions.
+            request_messages.insert(0, _COMPLEX_MODE_MESSAGE)
+        return request_messages
 
-        # Defensive fallback: if history is ever malformed, prepend instructions.
-        return [complex_mode_message, *request_messages]
+    def _response_cache_key(self, api_params: dict) -> bytes:
+        """Hash the full request (model, sampling params, tools, messages) into a cache key.
+
+        The key also covers this agent's base URL and API key.
+        """
+        digest = hashlib.blake2b(self._response_cache_scope, digest_size=16)
+        if api_params.get("tools") is TOOLS:
+            digest.update(_TOOLS_JSON)
+            api_params = {k: v for k, v in api_params.items() if k != "tools"}
+        digest.update(_json_dumps_sorted(api_params))
+        # Raw digest bytes: no hex encoding, and bytes hash as cheaply as str
+        return digest.digest()
 
     def chat(self, user_message: str, verbose: bool = False) -> str:
         """
@@ -298,18 +710,16 @@ class EU5Agent:
         """
         # Add raw user message to history
         is_complex_query = self._is_complex_query(user_message)
-        self.messages.append(cast(ChatCompletionMessageParam, {
+        # History appends use TypedDict literals (checked statically) or an
+        # ignore comment rather than typing.cast, which is a real call at runtime
+        self.messages.append({
             "role": "user",
             "content": user_message
-        }))
+        })
 
-        # Maximum iterations to prevent infinite loops
-        # Set to 10 to allow complex queries requiring multiple tool calls
-        # (web search + knowledge base lookups typically need 6-8 iterations)
-        max_iterations = 10
         iteration = 0
 
-        while iteration < max_iterations:
+        while iteration < MAX_TOOL_ITERATIONS:
             iteration += 1
 
             # Trim history before each API call to stay within limits
@@ -329,44 +739,62 @@ class EU5Agent:
                 api_params["max_completion_tokens"] = self.config.max_completion_tokens
             if EU5Config.supports_temperature(self.model):
                 api_params["temperature"] = self.config.temperature
+
+            # Identical requests (same model, params and history) reuse the
+            # previous final answer instead of paying for another API call
+            cache_key = None
+            if self.config.enable_response_cache:
+                cache_key = self._response_cache_key(api_params)
+                cached = response_cache.get(cache_key)
+                if cached is not None:
+                    self.messages.append(dict(cached))  # type: ignore[arg-type]
+                    content: str = cached["content"]
+                    return content
+
             response = self.client.chat.completions.create(**api_params)
 
             assistant_message = response.choices[0].message
 
             # Add assistant message to history
-            # Use cast() since model_dump() returns dict[str, Any] but we know it matches
-            self.messages.append(cast(ChatCompletionMessageParam, assistant_message.model_dump(exclude_unset=True)))
+            assistant_dump = _assistant_message_to_dict(assistant_message)
+            self.messages.append(assistant_dump)  # type: ignore[arg-type]
 
             # Check if assistant wants to call tools
             if assistant_message.tool_calls:
                 if verbose:
                     logger.info(f"\n[Tool Calls: {len(assistant_message.tool_calls)}]")
 
-                # Execute each tool call
-                for tool_call in assistant_message.tool_calls:
-                    if verbose:
+                if verbose:
+                    for tool_call in assistant_message.tool_calls:
                         # Type checker has incomplete stubs for tool_call.function
                         logger.info(f"  → {tool_call.function.name}({tool_call.function.arguments})")  # type: ignore[attr-defined]
 
-                    # Execute the tool
-                    tool_result = self._execute_tool_call(tool_call)
+                # Execute the tools (concurrently when there are several);
+                # results come back in the order the model requested them
+                tool_results = self._execute_tool_calls(assistant_message.tool_calls)
 
+                for tool_call, tool_result in zip(assistant_message.tool_calls, tool_results):
+                    tool_result = self._bound_tool_result(tool_result)
                     if verbose:
                         preview = tool_result[:200] + "..." if len(tool_result) > 200 else tool_result
                         logger.info(f"  ✓ Result: {preview}")
 
                     # Add tool result to messages
-                    self.messages.append(cast(ChatCompletionMessageParam, {
+                    self.messages.append({
                         "role": "tool",
                         "tool_call_id": tool_call.id,  # type: ignore[attr-defined]
                         "content": tool_result
-                    }))
+                    })
 
                 # Continue loop to get final response after tool execution
                 continue
 
             # No more tool calls - return final response
             if assistant_message.content:
+                # Only final answers are cached; tool-call turns are never
+                # replayed since their results may have changed
+                if cache_key is not None:
+                    response_cache.set(cache_key, dict(assistant_dump))
                 return assistant_message.content
 
         # Reached max iterations or no content generated
@@ -376,6 +804,23 @@ class EU5Agent:
             "Try asking a more specific question, or break it into smaller parts."
         )
 
+    async def chat_async(self, user_message: str, verbose: bool = False) -> str:
+        """
+        Awaitable version of chat() for use from asyncio code.
+
+        The blocking request/tool loop runs in a worker thread, so the event
+        loop stays free to drive other conversations meanwhile. Tool calls
+        within a turn already run concurrently (see _execute_tool_calls).
+
+        Args:
+            user_message: The user's question or prompt
+            verbose: If True, print tool calls and intermediate steps
+
+        Returns:
+            The agent's response
+        """
+        return await asyncio.to_thread(self.chat, user_message, verbose)
+
     def interactive(self):
         """
         Start an interactive conversation session.
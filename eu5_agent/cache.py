@@ -8,50 +8,183 @@ for unit tests and CI environments.
 from __future__ import annotations
 
 from collections import OrderedDict
+import re
 import threading
-from typing import Any, Dict, Optional
+import time
+from collections.abc import Hashable
+from typing import Any
+
+
+_MISSING = object()
 
 
 class LRUCache:
-    def __init__(self, maxsize: int = 128):
+    def __init__(self, maxsize: int = 128, ttl: float | None = None):
         self.maxsize = maxsize
-        self._cache: OrderedDict[str, Any] = OrderedDict()
+        # Seconds an entry stays valid; None keeps entries until evicted
+        self.ttl = ttl
+        self._cache: OrderedDict[Hashable, Any] = OrderedDict()
+        # Monotonic expiry time per key, only tracked for entries with a ttl
+        self._expires: dict[Hashable, float] = {}
         self._hits = 0
         self._misses = 0
-        # Reentrant lock for thread safety. This makes the cache safe to use
-        # across multiple threads and prevents race conditions in _cache,
-        # _hits, and _misses counters.
-        self._lock = threading.RLock()
+        # Lock for thread safety. This makes the cache safe to use across
+        # multiple threads and prevents race conditions in _cache, _hits, and
+        # _misses counters. No method re-enters the lock, so a plain Lock is
+        # enough and is cheaper to acquire than an RLock.
+        self._lock = threading.Lock()
 
-    def get(self, key: str) -> Optional[Any]:
+    def get(self, key: Hashable) -> Any | None:
         # Return cached value if present and update LRU order
         with self._lock:
+            try:
+                # Move to end (most recent); relinks in place, no rehash
+                self._cache.move_to_end(key)
+            except KeyError:
+                self._misses += 1
+                return None
+            expires = self._expires.get(key)
+            if expires is not None and expires <= time.monotonic():
+                del self._cache[key]
+                del self._expires[key]
+                self._misses += 1
+                return None
+            self._hits += 1
+            return self._cache[key]
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        """Store a value; ``ttl`` overrides the cache-wide ttl for this entry."""
+        if ttl is None:
+            ttl = self.ttl
+        with self._lock:
+            if ttl is not None:
+                self._expires[key] = time.monotonic() + ttl
+            else:
+                self._expires.pop(key, None)
             if key in self._cache:
-                # Move to end (most recent)
-                value = self._cache.pop(key)
+                # Refresh in place so that it becomes the most recent
+                self._cache.move_to_end(key)
                 self._cache[key] = value
-                self._hits += 1
-                return value
-            self._misses += 1
+                return
+            if len(self._cache) >= self.maxsize:
+                # Remove oldest entry
+                oldest, _ = self._cache.popitem(last=False)
+                self._expires.pop(oldest, None)
+            self._cache[key] = value
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a single entry; returns True if it was present."""
+        with self._lock:
+            self._expires.pop(key, None)
+            return self._cache.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._expires.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+
+# Unicode-aware, so Cyrillic or CJK queries keep their words
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Function words that never change what a search is about. Near-duplicate
+# queries may only differ in these; any other word (a nation, a year, a
+# mechanic) makes a different query.
+_STOPWORDS = frozenset({
+    "a", "about", "an", "and", "are", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or",
+    "should", "the", "to", "what", "when", "which", "with",
+})
+
+# Game-context words that web searches prefix onto every query; they say
+# nothing about the topic
+_CONTEXT_WORDS = frozenset({"eu5", "europa", "universalis"})
+
+
+def _tokenize(text: str) -> frozenset[str]:
+    """Lowercased content-word set; ignores case, punctuation, order and stopwords.
+
+    Game-context words are dropped too. An empty set means the query has no
+    topic words to compare, and SimilarityCache does not cache it.
+    """
+    return frozenset(_TOKEN_PATTERN.findall(text.lower())) - _STOPWORDS - _CONTEXT_WORDS
+
+
+class SimilarityCache:
+    """
+    LRU cache for free-text queries that also serves rephrased queries.
+
+    Queries are reduced to their content-word sets, so "France early-game",
+    "france early game" and "early game for France" share an entry. Two
+    queries only match when every word that differs between them is a
+    stopword; swapping any content word ("France" for "England") is a miss,
+    so one query's results are never passed off as another's. Queries with
+    no content words left (only stopwords, "EU5", or punctuation) are
+    neither looked up nor stored. Entries only match when ``scope`` (any
+    extra hashable parameters such as a result count) is identical.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._cache: OrderedDict[tuple[frozenset[str], Hashable], Any] = OrderedDict()
+        self._expires: dict[tuple[frozenset[str], Hashable], float] = {}
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, query: str, scope: Hashable = None) -> Any | None:
+        tokens = _tokenize(query)
+        if not tokens:
             return None
+        key = (tokens, scope)
+        with self._lock:
+            if key in self._cache and self.ttl is not None and self._expires[key] <= time.monotonic():
+                del self._cache[key]
+                del self._expires[key]
+            if key not in self._cache:
+                self._misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self._hits += 1
+            return self._cache[key]
 
-    def set(self, key: str, value: Any) -> None:
+    def set(self, query: str, value: Any, scope: Hashable = None) -> None:
+        tokens = _tokenize(query)
+        if not tokens:
+            return
+        key = (tokens, scope)
         with self._lock:
+            if self.ttl is not None:
+                self._expires[key] = time.monotonic() + self.ttl
             if key in self._cache:
-                # Remove old instance so that it becomes the most recent
-                self._cache.pop(key)
-            elif len(self._cache) >= self.maxsize:
-                # Remove oldest entry
-                self._cache.popitem(last=False)
+                self._cache.move_to_end(key)
+                self._cache[key] = value
+                return
+            if len(self._cache) >= self.maxsize:
+                oldest, _ = self._cache.popitem(last=False)
+                self._expires.pop(oldest, None)
             self._cache[key] = value
 
     def clear(self) -> None:
         with self._lock:
             self._cache.clear()
+            self._expires.clear()
             self._hits = 0
             self._misses = 0
 
-    def stats(self) -> Dict[str, int]:
+    def stats(self) -> dict[str, int]:
         with self._lock:
             return {
                 "size": len(self._cache),
@@ -63,9 +196,14 @@ class LRUCache:
 
 # Module-level default caches
 knowledge_cache = LRUCache(maxsize=256)
-search_cache = LRUCache(maxsize=1024)
+# Web results go stale (wiki edits, patches), so they expire after 15 minutes
+search_cache = LRUCache(maxsize=1024, ttl=900)
+response_cache = LRUCache(maxsize=512)
+similar_search_cache = SimilarityCache(maxsize=256, ttl=900)
 
 
 def clear_all_caches() -> None:
     knowledge_cache.clear()
     search_cache.clear()
+    response_cache.clear()
+    similar_search_cache.clear()
@@ -9,6 +9,7 @@ import logging
 import os
 import sys
 from pathlib import Path
+from typing import TYPE_CHECKING
 
 from rich.console import Console
 from rich.markdown import Markdown
@@ -16,9 +17,14 @@ from rich.panel import Panel
 from rich.prompt import Prompt
 from rich import print as rprint
 
-from .agent import EU5Agent
 from .config import load_dotenv_if_present
 
+if TYPE_CHECKING:
+    # The agent module pulls in the OpenAI SDK (~0.4s to import); main()
+    # imports it only once an agent is actually needed, so --help and
+    # --cache-stats stay fast.
+    from .agent import EU5Agent
+
 
 console = Console()
 
@@ -56,7 +62,7 @@ def print_help():
     console.print(Panel(Markdown(help_text), title="Help", border_style="green"))
 
 
-def run_interactive(agent: EU5Agent):
+def run_interactive(agent: "EU5Agent"):
     """
     Run the agent in interactive mode with rich formatting.
 
@@ -114,7 +120,7 @@ def run_interactive(agent: EU5Agent):
         raise
 
 
-def run_single_query(agent: EU5Agent, query: str, verbose: bool = False):
+def run_single_query(agent: "EU5Agent", query: str, verbose: bool = False):
     """
     Run a single query and display the response.
 
@@ -191,7 +197,7 @@ Environment Variables:
     parser.add_argument(
         "--cache-stats",
         action="store_true",
-        help="Dump in-memory cache statistics (knowledge/search) and exit",
+        help="Dump in-memory cache statistics (knowledge/search/response) and exit",
     )
 
     args = parser.parse_args()
@@ -199,13 +205,15 @@ Environment Variables:
     # If the user just wants cache stats, show them and exit early.
     if args.cache_stats:
         try:
-            from .cache import knowledge_cache, search_cache
+            from .cache import knowledge_cache, response_cache, search_cache, similar_search_cache
         except Exception:  # pragma: no cover - defensive import
             console.print("[bold red]Unable to import cache module.[/bold red]")
             sys.exit(1)
 
         ks = knowledge_cache.stats()
         ss = search_cache.stats()
+        rs = response_cache.stats()
+        sims = similar_search_cache.stats()
         from rich.table import Table
 
         table = Table(title="EU5 CLI Cache Stats")
@@ -217,6 +225,8 @@ Environment Variables:
 
         table.add_row("knowledge", str(ks.get("size", 0)), str(ks.get("maxsize", 0)), str(ks.get("hits", 0)), str(ks.get("misses", 0)))
         table.add_row("search", str(ss.get("size", 0)), str(ss.get("maxsize", 0)), str(ss.get("hits", 0)), str(ss.get("misses", 0)))
+        table.add_row("response", str(rs.get("size", 0)), str(rs.get("maxsize", 0)), str(rs.get("hits", 0)), str(rs.get("misses", 0)))
+        table.add_row("search (similar)", str(sims.get("size", 0)), str(sims.get("maxsize", 0)), str(sims.get("hits", 0)), str(sims.get("misses", 0)))
 
         console.print(table)
         sys.exit(0)
@@ -246,6 +256,8 @@ Environment Variables:
         sys.exit(1)
 
     # Initialize agent
+    from .agent import EU5Agent
+
     try:
         agent = EU5Agent(model=args.model)
     except Exception as e:
@@ -253,10 +265,11 @@ Environment Variables:
         sys.exit(1)
 
     # Run in appropriate mode
-    if args.query:
-        run_single_query(agent, args.query, verbose=args.verbose)
-    else:
-        run_interactive(agent)
+    with agent:
+        if args.query:
+            run_single_query(agent, args.query, verbose=args.verbose)
+        else:
+            run_interactive(agent)
 
 
 if __name__ == "__main__":
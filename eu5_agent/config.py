@@ -9,12 +9,12 @@ Simple configuration loader that supports:
 Keeps the standalone agent lightweight and independent.
 """
 
+import functools
 import os
 from pathlib import Path
-from typing import Optional
 
 
-def _parse_float(value: Optional[str], default: float) -> float:
+def _parse_float(value: str | None, default: float) -> float:
     """Parse an env var as float, returning default on failure."""
     if value is None:
         return default
@@ -24,7 +24,7 @@ def _parse_float(value: Optional[str], default: float) -> float:
         return default
 
 
-def _parse_int(value: Optional[str], default: int) -> int:
+def _parse_int(value: str | None, default: int) -> int:
     """Parse an env var as int, returning default on failure."""
     if value is None:
         return default
@@ -34,7 +34,19 @@ def _parse_int(value: Optional[str], default: int) -> int:
         return default
 
 
-def load_dotenv_if_present():
+def _parse_bool(value: str | None, default: bool) -> bool:
+    """Parse an env var as a boolean flag, returning default if unset or unrecognized."""
+    if value is None:
+        return default
+    normalized = value.strip().lower()
+    if normalized in ("1", "true", "yes", "on"):
+        return True
+    if normalized in ("0", "false", "no", "off"):
+        return False
+    return default
+
+
+def load_dotenv_if_present() -> bool:
     """Load .env file if it exists (using python-dotenv if available)."""
     try:
         from dotenv import load_dotenv
@@ -48,6 +60,16 @@ def load_dotenv_if_present():
     return False
 
 
+@functools.cache
+def _load_dotenv_once() -> bool:
+    """Load .env on the first EU5Config() after import or reset_config().
+
+    load_dotenv never overrides variables that are already set, so parsing
+    the file again for later configs in the same process changes nothing.
+    """
+    return load_dotenv_if_present()
+
+
 class EU5Config:
     """
     Configuration for EU5 Standalone Agent.
@@ -60,8 +82,8 @@ class EU5Config:
 
     def __init__(self):
         """Initialize configuration from environment."""
-        # Try to load .env file
-        load_dotenv_if_present()
+        # Try to load .env file (once per process)
+        _load_dotenv_once()
 
         # OpenAI API Configuration
         self.api_key = os.getenv("OPENAI_API_KEY")
@@ -88,6 +110,26 @@ class EU5Config:
             os.getenv("EU5_MAX_HISTORY_MESSAGES"), default=100
         )
 
+        # Cap on a single tool result kept in history (0 disables). Every
+        # later API call in the session re-sends it; the default fits the
+        # largest packaged knowledge file, so only outliers are cut.
+        self.max_tool_result_chars = _parse_int(
+            os.getenv("EU5_MAX_TOOL_RESULT_CHARS"), default=20000
+        )
+
+        # Reuse final answers for identical requests within a process.
+        # Opt-in: with a non-zero temperature a repeated question would
+        # otherwise always get the first sampled answer back.
+        self.enable_response_cache = _parse_bool(
+            os.getenv("EU5_RESPONSE_CACHE"), default=False
+        )
+
+        # Encode OpenAI request bodies with orjson. Opt-in: it patches the
+        # SDK module, so it applies to every OpenAI client in the process.
+        self.fast_request_json = _parse_bool(
+            os.getenv("EU5_FAST_REQUEST_JSON"), default=False
+        )
+
     @staticmethod
     def supports_temperature(model: str) -> bool:
         """Check if the model supports temperature parameter."""
@@ -104,7 +146,7 @@ class EU5Config:
             return True
         return False
 
-    def validate(self) -> tuple[bool, Optional[str]]:
+    def validate(self) -> tuple[bool, str | None]:
         """
         Validate configuration.
 
@@ -133,8 +175,8 @@ class EU5Config:
                 from .knowledge import EU5Knowledge
 
                 # Attempt to construct (this triggers auto-detection). No
-                # need to use the instance afterward.
-                EU5Knowledge()
+                # need to use the instance afterward, so skip preloading.
+                EU5Knowledge(preload=False)
             except FileNotFoundError:
                 return False, (
                     "Knowledge base could not be detected locally.\n"
@@ -176,6 +218,9 @@ class EU5Config:
             f"  temperature={self.temperature}\n"
             f"  max_completion_tokens={self.max_completion_tokens}\n"
             f"  max_history_messages={self.max_history_messages}\n"
+            f"  max_tool_result_chars={self.max_tool_result_chars}\n"
+            f"  enable_response_cache={self.enable_response_cache}\n"
+            f"  fast_request_json={self.fast_request_json}\n"
             f")"
         )
 
@@ -193,9 +238,13 @@ def get_config() -> EU5Config:
 
 
 def reset_config():
-    """Reset the global configuration (useful for testing)."""
+    """Reset the global configuration (useful for testing).
+
+    The next EU5Config() reads the .env file again.
+    """
     global _config
     _config = None
+    _load_dotenv_once.cache_clear()
 
 
 # Quick test
@@ -5,11 +5,16 @@ Simple, direct file loading for the EU5 knowledge base.
 No framework dependencies - just reads markdown files and returns content.
 """
 
+import logging
 import os
+import sys
+from collections.abc import Iterable
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, cast
 from .cache import knowledge_cache
 
+logger = logging.getLogger(__name__)
+
 
 class EU5Knowledge:
     """
@@ -23,7 +28,7 @@ class EU5Knowledge:
     """
 
     # Knowledge base file mapping - organized by EU5's 8 main game panels
-    KNOWLEDGE_MAP: Dict[str, Dict[str, str]] = {
+    KNOWLEDGE_MAP: dict[str, dict[str, str]] = {
         "mechanics": {
             # Core game mechanics covering all 8 main panels
             "economy": "mechanics/economy_mechanics.md",          # Economy panel
@@ -48,13 +53,14 @@ class EU5Knowledge:
         }
     }
 
-    def __init__(self, knowledge_path: Optional[str] = None):
+    def __init__(self, knowledge_path: str | None = None, preload: bool = True):
         """
         Initialize the knowledge loader.
 
         Args:
             knowledge_path: Path to knowledge base directory.
                            Defaults to the 'knowledge' directory in the repository.
+            preload: Load every mapped file into the cache up front (default True)
         """
         if knowledge_path is None:
             # Try environment variable first
@@ -79,13 +85,48 @@ class EU5Knowledge:
 
         # Cache the resolved path to avoid repeated path resolution
         # This saves ~0.027ms per get_knowledge() call
-        self._resolved_path = str(self.knowledge_path.resolve())
+        # Interned so the cache-key tuples share one path object
+        self._resolved_path = sys.intern(str(self.knowledge_path.resolve()))
+
+        # Absolute path for every mapped topic, built once so loads are a dict
+        # lookup. Entries added to KNOWLEDGE_MAP later are joined on first use.
+        self._file_paths: dict[tuple[str, str], str] = {
+            (category, subcategory): os.path.join(self._resolved_path, filename)
+            for category, topics in self.KNOWLEDGE_MAP.items()
+            for subcategory, filename in topics.items()
+        }
+
+        if preload:
+            self.preload()
+
+    def preload(self) -> None:
+        """Warm the knowledge cache with every file in KNOWLEDGE_MAP.
+
+        The whole knowledge base is ~100 KB of markdown, so reading it once
+        here turns every later lookup into a cache hit with no file I/O.
+        Missing or unreadable files are logged and left to fail on lookup
+        (error results are never cached).
+        """
+        for (category, subcategory) in self._file_paths:
+            result = self.get_knowledge(category, subcategory)
+            if result["status"] != "success":
+                logger.warning("Could not preload %s/%s: %s", category, subcategory, result["error"])
+
+    def invalidate(self) -> None:
+        """Drop this knowledge base's cached files so edits on disk are re-read.
+
+        Only entries for this knowledge path are removed; other knowledge
+        bases sharing the process-wide cache keep theirs.
+        """
+        for category, topics in self.KNOWLEDGE_MAP.items():
+            for subcategory in topics:
+                knowledge_cache.delete((self._resolved_path, category, subcategory))
 
     def list_categories(self) -> list[str]:
         """Get list of available knowledge categories."""
-        return list(self.KNOWLEDGE_MAP.keys())
+        return list(self.KNOWLEDGE_MAP)
 
-    def list_subcategories(self, category: str) -> Optional[list[str]]:
+    def list_subcategories(self, category: str) -> list[str] | None:
         """
         Get list of available subcategories for a category.
 
@@ -97,13 +138,30 @@ class EU5Knowledge:
         """
         if category not in self.KNOWLEDGE_MAP:
             return None
-        return list(self.KNOWLEDGE_MAP[category].keys())
+        return list(self.KNOWLEDGE_MAP[category])
+
+    @staticmethod
+    def _load_file(file_path: str) -> str:
+        """
+        Read a knowledge file from disk (uncached; callers go through knowledge_cache).
+
+        Reads raw bytes and decodes in one pass, which skips the text-mode
+        incremental decoder. Newlines are normalized afterwards to match what
+        text mode would return for CRLF checkouts. Each file is read once and
+        the decoded text is served from knowledge_cache afterwards, so mmap
+        would only add open handles without saving any copies.
+        """
+        with open(file_path, 'rb') as f:
+            content = f.read().decode('utf-8')
+        if '\r' in content:
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
+        return content
 
     def get_knowledge(
         self,
         category: str,
-        subcategory: Optional[str] = None
-    ) -> Dict[str, Any]:
+        subcategory: str | None = None
+    ) -> dict[str, Any]:
         """
         Retrieve knowledge from the knowledge base.
 
@@ -114,12 +172,23 @@ class EU5Knowledge:
         Returns:
             Dictionary with 'status', 'content', and optionally 'error' keys
         """
+        # Only successful loads are cached, so a hit is already a valid topic:
+        # warm lookups cost one cache probe and skip validation entirely. The
+        # cache key includes the knowledge path to avoid stale content when
+        # several knowledge bases are used in one process (e.g., tests).
+        cache_key: tuple[str, str, str] | None = None
+        if subcategory:
+            cache_key = (self._resolved_path, category, subcategory)
+            cached = cast(dict[str, Any] | None, knowledge_cache.get(cache_key))
+            if cached is not None:
+                return cached
+
         # Validate category
         if category not in self.KNOWLEDGE_MAP:
             return {
                 "status": "error",
                 "error": f"Invalid category '{category}'. "
-                        f"Available: {self.list_categories()}"
+                        f"Available: {list(self.KNOWLEDGE_MAP)}"
             }
 
         # If no subcategory, list available options
@@ -128,8 +197,9 @@ class EU5Knowledge:
             if category == "resources":
                 subcategory = "all"
             else:
-                available = self.list_subcategories(category)
-                if not available:
+                # Join the topic dict directly; no intermediate list needed
+                topics = self.KNOWLEDGE_MAP[category]
+                if not topics:
                     return {
                         "status": "list",
                         "content": f"Please specify a subcategory. Available in '{category}': (none)"
@@ -137,13 +207,13 @@ class EU5Knowledge:
                 return {
                     "status": "list",
                     "content": f"Please specify a subcategory. "
-                              f"Available in '{category}': {', '.join(available)}"
+                              f"Available in '{category}': {', '.join(topics)}"
                 }
 
         # Validate subcategory
-        if subcategory not in self.KNOWLEDGE_MAP[category]:
-            available = self.list_subcategories(category)
-            if not available:
+        topics = self.KNOWLEDGE_MAP[category]
+        if subcategory not in topics:
+            if not topics:
                 return {
                     "status": "error",
                     "error": f"Invalid subcategory '{subcategory}' for '{category}'. Available: (none)"
@@ -151,49 +221,71 @@ class EU5Knowledge:
             return {
                 "status": "error",
                 "error": f"Invalid subcategory '{subcategory}' for '{category}'. "
-                        f"Available: {', '.join(available)}"
+                        f"Available: {', '.join(topics)}"
             }
 
-        # Load the knowledge file
-        filename = self.KNOWLEDGE_MAP[category][subcategory]
-        file_path = self.knowledge_path / filename
-
-        if not file_path.exists():
+        if cache_key is None:
+            # Defaulted subcategory (resources -> all): probe the cache now.
+            # A tuple key avoids formatting a new string on every lookup.
+            cache_key = (self._resolved_path, category, subcategory)
+            cached = cast(dict[str, Any] | None, knowledge_cache.get(cache_key))
+            if cached is not None:
+                return cached
+
+        # Load the knowledge file from its precomputed absolute path
+        filename = topics[subcategory]
+        file_path = self._file_paths.get((category, subcategory))
+        if file_path is None:
+            # Topic added to KNOWLEDGE_MAP after __init__; join once and keep it
+            file_path = os.path.join(self._resolved_path, filename)
+            self._file_paths[(category, subcategory)] = file_path
+
+        # Open directly and treat FileNotFoundError as "missing" rather than
+        # stat'ing the file first; saves a syscall on every cold load.
+        try:
+            content = self._load_file(file_path)
+        except FileNotFoundError:
             return {
                 "status": "error",
                 "error": f"Knowledge file not found: {filename}"
             }
-        # Use caching to avoid repeated disk reads
-        # Use knowledge path in cache key to avoid stale cache when multiple
-        # knowledge bases are used in a single process (e.g., tests or dynamic
-        # loading of content). We use the pre-resolved path from __init__.
-        cache_key = f"knowledge:{self._resolved_path}:{category}:{subcategory}"
-        cached = knowledge_cache.get(cache_key)
-        if cached is not None:
-            return cached
-
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-
-            result = {
-                "status": "success",
-                "content": content,
-                "source": f"{category}/{subcategory}",
-                "file": filename,
-                "size": len(content)
-            }
-
-            knowledge_cache.set(cache_key, result)
-
-            return result
-
         except Exception as e:
             return {
                 "status": "error",
                 "error": f"Failed to read {filename}: {str(e)}"
             }
 
+        result = {
+            "status": "success",
+            "content": content,
+            "source": f"{category}/{subcategory}",
+            "file": filename,
+            "size": len(content)
+        }
+
+        knowledge_cache.set(cache_key, result)
+
+        return result
+
+    def get_knowledge_batch(
+        self,
+        requests: Iterable[tuple[str, str | None]]
+    ) -> dict[tuple[str, str | None], dict[str, Any]]:
+        """
+        Retrieve several topics at once.
+
+        Args:
+            requests: (category, subcategory) pairs; duplicates are looked up once
+
+        Returns:
+            Dictionary mapping each distinct pair to its get_knowledge() result
+        """
+        results: dict[tuple[str, str | None], dict[str, Any]] = {}
+        for request in requests:
+            if request not in results:
+                results[request] = self.get_knowledge(*request)
+        return results
+
 
 # Quick test function
 if __name__ == "__main__":
@@ -4,11 +4,17 @@ EU5 Strategy Agent Prompts
 System prompt and tool definitions for OpenAI function calling.
 """
 
-from typing import List
-from openai.types.chat import ChatCompletionToolParam
+from typing import TYPE_CHECKING, Final, Tuple
 
-# System prompt for the EU5 strategy advisor
-SYSTEM_PROMPT = """You are an expert strategy advisor for Europa Universalis 5 (EU5), a grand strategy game spanning from 1337 to 1837. Your role is to provide strategic guidance, opening moves, and winning tactics to players of all skill levels.
+if TYPE_CHECKING:
+    # Typing only; importing the OpenAI SDK here would slow every import of
+    # the agent module
+    from openai.types.chat import ChatCompletionToolParam
+
+# System prompt for the EU5 strategy advisor. Sent verbatim as the first
+# message of every request; keep it static (no per-turn interpolation) so the
+# request prefix stays byte-identical and provider-side prompt caching hits.
+SYSTEM_PROMPT: Final[str] = """You are an expert strategy advisor for Europa Universalis 5 (EU5), a grand strategy game spanning from 1337 to 1837. Your role is to provide strategic guidance, opening moves, and winning tactics to players of all skill levels.
 
 Your knowledge base includes:
 - Comprehensive game mechanics covering all 8 main game panels (Government, Economy, Production, Society, Diplomacy, Military, Geopolitics, Advances)
@@ -67,8 +73,9 @@ For opening strategies, provide:
 
 Always be encouraging and help players understand that EU5 is a complex game that rewards patience and strategic thinking."""
 
-# Tool definitions for OpenAI function calling
-TOOLS: List[ChatCompletionToolParam] = [
+# Tool definitions for OpenAI function calling. A tuple, shared by every agent
+# and never modified, so the agent can serialize it once for cache keys.
+TOOLS: Final[Tuple["ChatCompletionToolParam", ...]] = (
     {
         "type": "function",
         "function": {
@@ -113,4 +120,4 @@ TOOLS: List[ChatCompletionToolParam] = [
             }
         }
     }
-]
+)
@@ -13,25 +13,140 @@ Advantages over Google scraping:
 
 Available Functions:
 - search_eu5_wiki(): Basic search (default, used by agent)
+- search_eu5_wiki_async(): Awaitable basic search for asyncio callers
 - search_eu5_wiki_comprehensive(): Advanced search (available for library users)
 
 Note: The comprehensive search is not currently used by the agent but is available
 for direct use by library consumers who need deeper search coverage or longer snippets.
 """
 
+import asyncio
 import os
+import re
 import sys
 import warnings
-from typing import List, Dict, Optional, Any
-from .cache import search_cache
+from typing import Any
+from .cache import search_cache, similar_search_cache
 
 # Public API
-__all__ = ['search_eu5_wiki', 'search_eu5_wiki_comprehensive']
+__all__ = ['search_eu5_wiki', 'search_eu5_wiki_async', 'search_eu5_wiki_comprehensive']
 
 # Cache for Tavily client instances (keyed by API key)
 # Avoids reinitializing client on every search call
-# Using Any since TavilyClient is imported conditionally inside functions
-_tavily_clients: Dict[str, Any] = {}
+# Using Any since TavilyClient is imported lazily in _get_client()
+_tavily_clients: dict[str, Any] = {}
+
+
+# Empty or failed searches are remembered only briefly: long enough to stop
+# a retry loop from hammering Tavily, short enough to pick up recovery
+_NEGATIVE_TTL = 60
+
+# One case-insensitive scan instead of lowercasing the query twice
+_EU5_CONTEXT_PATTERN = re.compile(r"eu5|europa universalis", re.IGNORECASE)
+
+# Sites both search modes are restricted to
+_EU5_DOMAINS = ["eu5.paradoxwikis.com", "europauniversalisv.wiki"]
+
+
+def _resolve_api_key(api_key: str | None) -> str | None:
+    """
+    Pick the Tavily API key from the argument or TAVILY_API_KEY.
+
+    Tavily is optional, so a missing key returns None without a warning
+    (the agent handles empty results gracefully). A key without the 'tvly-'
+    prefix also returns None, after warning the caller.
+    """
+    api_key = api_key or os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        return None
+
+    # Validate API key format (Tavily keys start with 'tvly-')
+    if not api_key.startswith('tvly-'):
+        warnings.warn(
+            "TAVILY_API_KEY appears invalid (should start with 'tvly-')",
+            UserWarning,
+            stacklevel=3
+        )
+        return None
+    return api_key
+
+
+# Exception types raised through the Tavily client, grouped by how the
+# failure is reported. Filled in by _load_error_types() when the first
+# client is built; an empty tuple matches nothing in an except clause.
+_KEY_ERRORS: tuple[type[Exception], ...] = ()
+_QUOTA_ERRORS: tuple[type[Exception], ...] = ()
+# requests' connection errors subclass OSError, as do socket errors
+_NETWORK_ERRORS: tuple[type[Exception], ...] = (OSError,)
+
+
+def _load_error_types() -> None:
+    """
+    Resolve the Tavily and requests exception classes for the except clauses.
+
+    Each import is guarded: older tavily-python releases lack some of these
+    classes, and a missing one must not turn a failed search into a crash.
+    """
+    global _KEY_ERRORS, _QUOTA_ERRORS, _NETWORK_ERRORS
+    try:
+        from tavily import (  # type: ignore[import-untyped]
+            InvalidAPIKeyError,
+            MissingAPIKeyError,
+            UsageLimitExceededError,
+        )
+    except ImportError:
+        pass
+    else:
+        _KEY_ERRORS = (InvalidAPIKeyError, MissingAPIKeyError)
+        _QUOTA_ERRORS = (UsageLimitExceededError,)
+
+    network: list[type[Exception]] = [OSError]
+    try:
+        # tavily wraps request timeouts in its own TimeoutError, which is a
+        # plain Exception rather than an OSError
+        from tavily.errors import TimeoutError as TavilyTimeoutError  # type: ignore[import-untyped]
+    except ImportError:
+        pass
+    else:
+        network.append(TavilyTimeoutError)
+    try:
+        from requests import RequestException
+    except ImportError:
+        pass
+    else:
+        network.append(RequestException)
+    _NETWORK_ERRORS = tuple(network)
+
+
+def _search_failed(cache_key: tuple[str, str, int], message: str) -> list[dict[str, str]]:
+    """
+    Warn about a failed Tavily call and return no results.
+
+    The failure is cached briefly so retries within a minute don't repeat
+    the call; the agent handles the empty result.
+    """
+    warnings.warn(message, UserWarning, stacklevel=3)
+    search_cache.set(cache_key, [], ttl=_NEGATIVE_TTL)
+    return []
+
+
+def _get_client(api_key: str) -> Any:
+    """
+    Return the shared TavilyClient for an API key, creating it on first use.
+
+    tavily is imported only when a client is constructed, so later searches
+    skip the import statement entirely and reuse the client's HTTP session.
+
+    Raises:
+        ImportError: If tavily-python is not installed
+    """
+    client = _tavily_clients.get(api_key)
+    if client is None:
+        from tavily import TavilyClient
+
+        _load_error_types()
+        client = _tavily_clients[api_key] = TavilyClient(api_key=api_key)
+    return client
 
 
 def _ensure_eu5_context(query: str) -> str:
@@ -44,12 +159,17 @@ def _ensure_eu5_context(query: str) -> str:
     Returns:
         Query prefixed with "EU5" if not already present
     """
-    if "eu5" not in query.lower() and "europa universalis" not in query.lower():
+    if not _EU5_CONTEXT_PATTERN.search(query):
         return f"EU5 {query}"
     return query
 
 
-def search_eu5_wiki(query: str, max_results: int = 3, api_key: Optional[str] = None) -> List[Dict[str, str]]:
+def _cache_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a query for cache keys."""
+    return " ".join(query.lower().split())
+
+
+def search_eu5_wiki(query: str, max_results: int = 3, api_key: str | None = None) -> list[dict[str, str]]:
     """
     Search for EU5 content using Tavily API, prioritizing the official wiki.
 
@@ -61,44 +181,35 @@ def search_eu5_wiki(query: str, max_results: int = 3, api_key: Optional[str] = N
     Returns:
         List of search results with 'title', 'url', and 'snippet'
     """
-    # Check if Tavily API key is available (from parameter or environment)
-    api_key = api_key or os.getenv("TAVILY_API_KEY")
-
-    if not api_key:
-        # Tavily is optional - if not configured, return empty list
-        # Agent will handle this gracefully
-        return []
-
-    # Validate API key format (Tavily keys start with 'tvly-')
-    if not api_key.startswith('tvly-'):
-        warnings.warn(
-            "TAVILY_API_KEY appears invalid (should start with 'tvly-')",
-            UserWarning,
-            stacklevel=2
-        )
+    api_key = _resolve_api_key(api_key)
+    if api_key is None:
         return []
 
     # Ensure query includes EU5 context
     query = _ensure_eu5_context(query)
-    # Build cache key - do not include full API key to avoid storing secrets
-    cache_key = f"search:{query}:{max_results}"
+    # Build cache key - do not include full API key to avoid storing secrets.
+    # A tuple key skips string formatting and cannot collide when the query
+    # itself contains the separator.
+    # Queries differing only in case or spacing share an entry.
+    cache_key = ("search", _cache_query(query), max_results)
     cached = search_cache.get(cache_key)
     if cached is not None:
         return cached
 
-    try:
-        from tavily import TavilyClient
+    # Rephrasings of an earlier query ("france early-game" vs "early game in
+    # France") reuse its results; any differing content word is a miss
+    similar: list[dict[str, str]] | None = similar_search_cache.get(query, scope=max_results)
+    if similar is not None:
+        return similar
 
-        # Use cached client if available, otherwise create and cache
-        if api_key not in _tavily_clients:
-            _tavily_clients[api_key] = TavilyClient(api_key=api_key)
-        client = _tavily_clients[api_key]
+    try:
+        client = _get_client(api_key)
 
         # Search with domain prioritization for EU5 wiki
         response = client.search(
             query=query,
             max_results=max_results,
-            include_domains=["eu5.paradoxwikis.com", "europauniversalisv.wiki"],
+            include_domains=_EU5_DOMAINS,
             search_depth="basic"  # Use "advanced" for more comprehensive results
         )
 
@@ -116,8 +227,13 @@ def search_eu5_wiki(query: str, max_results: int = 3, api_key: Optional[str] = N
                 "snippet": snippet
             })
 
-        # Store in cache for faster repeated queries
-        search_cache.set(cache_key, results)
+        # Store in cache for faster repeated queries. Only non-empty results
+        # are shared with near-duplicate queries.
+        if results:
+            search_cache.set(cache_key, results)
+            similar_search_cache.set(query, results, scope=max_results)
+        else:
+            search_cache.set(cache_key, results, ttl=_NEGATIVE_TTL)
         return results
 
     except ImportError:
@@ -128,13 +244,41 @@ def search_eu5_wiki(query: str, max_results: int = 3, api_key: Optional[str] = N
             stacklevel=2
         )
         return []
+    except _KEY_ERRORS as e:
+        return _search_failed(
+            cache_key, f"Tavily search failed: API key rejected (check TAVILY_API_KEY): {e}"
+        )
+    except _QUOTA_ERRORS as e:
+        return _search_failed(cache_key, f"Tavily search failed: usage limit exceeded: {e}")
+    except _NETWORK_ERRORS as e:
+        # Timeouts and connection failures; worth retrying later
+        return _search_failed(cache_key, f"Tavily search failed: network error: {e}")
     except Exception as e:
-        # Return empty list on error, agent will handle it
-        warnings.warn(f"Tavily search error: {e}", UserWarning, stacklevel=2)
-        return []
+        # Anything else (e.g. an unexpected response shape) still degrades to
+        # no results instead of failing the agent's tool call
+        return _search_failed(cache_key, f"Tavily search error: {e}")
 
 
-def search_eu5_wiki_comprehensive(query: str, max_results: int = 5, api_key: Optional[str] = None) -> List[Dict[str, str]]:
+async def search_eu5_wiki_async(query: str, max_results: int = 3, api_key: str | None = None) -> list[dict[str, str]]:
+    """
+    Awaitable version of search_eu5_wiki() for use from asyncio code.
+
+    The blocking Tavily call runs in a worker thread, so several searches can
+    be awaited together (e.g. with asyncio.gather) and share the same caches
+    and client as the sync function.
+
+    Args:
+        query: Search query (will be prefixed with "EU5" if not already)
+        max_results: Maximum number of results to return
+        api_key: Tavily API key (optional, falls back to TAVILY_API_KEY env var)
+
+    Returns:
+        List of search results with 'title', 'url', and 'snippet'
+    """
+    return await asyncio.to_thread(search_eu5_wiki, query, max_results, api_key)
+
+
+def search_eu5_wiki_comprehensive(query: str, max_results: int = 5, api_key: str | None = None) -> list[dict[str, str]]:
     """
     Comprehensive search for EU5 content using Tavily's advanced search mode.
 
@@ -153,40 +297,25 @@ def search_eu5_wiki_comprehensive(query: str, max_results: int = 5, api_key: Opt
     Returns:
         List of detailed search results with 'title', 'url', 'snippet', and 'score'
     """
-    api_key = api_key or os.getenv("TAVILY_API_KEY")
-
-    if not api_key:
-        return []
-
-    # Validate API key format (Tavily keys start with 'tvly-')
-    if not api_key.startswith('tvly-'):
-        warnings.warn(
-            "TAVILY_API_KEY appears invalid (should start with 'tvly-')",
-            UserWarning,
-            stacklevel=2
-        )
+    api_key = _resolve_api_key(api_key)
+    if api_key is None:
         return []
 
     # Ensure query includes EU5 context
     query = _ensure_eu5_context(query)
-    cache_key = f"search_comp:{query}:{max_results}"
+    cache_key = ("search_comp", _cache_query(query), max_results)
     cached = search_cache.get(cache_key)
     if cached is not None:
         return cached
 
     try:
-        from tavily import TavilyClient
-
-        # Use cached client if available, otherwise create and cache
-        if api_key not in _tavily_clients:
-            _tavily_clients[api_key] = TavilyClient(api_key=api_key)
-        client = _tavily_clients[api_key]
+        client = _get_client(api_key)
 
         # Advanced search with more comprehensive results
         response = client.search(
             query=query,
             max_results=max_results,
-            include_domains=["eu5.paradoxwikis.com", "europauniversalisv.wiki"],
+            include_domains=_EU5_DOMAINS,
             search_depth="advanced",  # More thorough search
             include_raw_content=False  # Get clean text only
         )
@@ -208,8 +337,8 @@ def search_eu5_wiki_comprehensive(query: str, max_results: int = 5, api_key: Opt
         # Sort by relevance score (highest first)
         results.sort(key=lambda x: x["score"], reverse=True)
 
-        # Store in cache
-        search_cache.set(cache_key, results)
+        # Store in cache (briefly if nothing was found)
+        search_cache.set(cache_key, results, ttl=None if results else _NEGATIVE_TTL)
         return results
 
     except ImportError:
@@ -219,9 +348,19 @@ def search_eu5_wiki_comprehensive(query: str, max_results: int = 5, api_key: Opt
             stacklevel=2
         )
         return []
+    except _KEY_ERRORS as e:
+        return _search_failed(
+            cache_key,
+            f"Tavily comprehensive search failed: API key rejected (check TAVILY_API_KEY): {e}",
+        )
+    except _QUOTA_ERRORS as e:
+        return _search_failed(
+            cache_key, f"Tavily comprehensive search failed: usage limit exceeded: {e}"
+        )
+    except _NETWORK_ERRORS as e:
+        return _search_failed(cache_key, f"Tavily comprehensive search failed: network error: {e}")
     except Exception as e:
-        warnings.warn(f"Tavily comprehensive search error: {e}", UserWarning, stacklevel=2)
-        return []
+        return _search_failed(cache_key, f"Tavily comprehensive search error: {e}")
 
 
 # Quick test function
@@ -8,13 +8,41 @@ This module provides:
 - Configuration fixtures for testing
 """
 
-import tempfile
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Generator, Optional
+from types import SimpleNamespace
+from typing import Dict, Optional
 from unittest.mock import Mock
 
 import pytest
 
+# Imported once at collection rather than inside the per-test autouse fixtures
+from eu5_agent.cache import response_cache
+from eu5_agent.config import reset_config
+
+
+# Every environment variable EU5Config reads; clean_env removes all of them
+_CONFIG_ENV_VARS = (
+    "OPENAI_API_KEY",
+    "OPENAI_MODEL",
+    "OPENAI_BASE_URL",
+    "OPENAI_TEMPERATURE",
+    "OPENAI_MAX_COMPLETION_TOKENS",
+    "EU5_KNOWLEDGE_PATH",
+    "EU5_MAX_HISTORY_MESSAGES",
+    "EU5_MAX_TOOL_RESULT_CHARS",
+    "EU5_RESPONSE_CACHE",
+    "EU5_FAST_REQUEST_JSON",
+    "TAVILY_API_KEY",
+)
+
+_MOCK_ENV = {
+    "OPENAI_API_KEY": "sk-test-key-12345",
+    "OPENAI_MODEL": "gpt-5-mini",
+    "OPENAI_BASE_URL": "https://api.openai.com/v1",
+    "TAVILY_API_KEY": "tvly-test-key-12345",
+}
+
 
 @pytest.fixture
 def mock_openai_response():
@@ -31,86 +59,142 @@ def mock_openai_response():
             tool_calls: Optional list of tool calls
             finish_reason: Completion finish reason
         """
-        message = Mock()
-        message.content = content
-        message.tool_calls = tool_calls
-        message.role = "assistant"
-        message.model_dump = Mock(
-            return_value={"role": "assistant", "content": content, "tool_calls": tool_calls}
+        # Plain namespaces rather than Mock: nothing asserts on calls to these
+        # objects, and they are built for nearly every agent test
+        message = SimpleNamespace(
+            content=content,
+            tool_calls=tool_calls,
+            role="assistant",
+            model_dump=lambda: {"role": "assistant", "content": content, "tool_calls": tool_calls},
+        )
+        choice = SimpleNamespace(message=message, finish_reason=finish_reason)
+        usage = SimpleNamespace(prompt_tokens=10, completion_tokens=20, total_tokens=30)
+
+        response = SimpleNamespace(
+            choices=[choice],
+            model="gpt-5-mini",
+            id="chatcmpl-test123",
+            usage=usage,
         )
-
-        choice = Mock()
-        choice.message = message
-        choice.finish_reason = finish_reason
-
-        usage = Mock()
-        usage.prompt_tokens = 10
-        usage.completion_tokens = 20
-        usage.total_tokens = 30
-
-        response = Mock()
-        response.choices = [choice]
-        response.model = "gpt-5-mini"
-        response.id = "chatcmpl-test123"
-        response.usage = usage
 
         return response
 
     return _create_response
 
 
-@pytest.fixture
-def temp_knowledge_base() -> Generator[Path, None, None]:
+# Sample knowledge base: (path relative to the knowledge dir, markdown)
+_SAMPLE_KNOWLEDGE_FILES = (
+    ("mechanics/economy_mechanics.md",
+     "# Economy Mechanics\n\nTest content for economy mechanics."),
+    ("mechanics/society_mechanics.md",
+     "# Society Mechanics\n\nTest content for society (estates) mechanics."),
+    ("mechanics/military_mechanics.md",
+     "# Military Mechanics\n\nTest content for military mechanics."),
+    ("strategy/beginner_route.md",
+     "# Beginner's Route\n\nTest guide for beginners."),
+    ("strategy/common_mistakes.md",
+     "# Common Mistakes\n\nTest list of common mistakes."),
+    ("nations/nation_england.md",
+     "# England Strategy\n\nTest opening strategy for England."),
+    ("resources/eu5_resources.md",
+     "# EU5 Resources\n\nTest list of community resources."),
+)
+
+
+def _write_sample_knowledge_base(kb_path: Path) -> Path:
+    """Create the sample knowledge base directory tree under kb_path."""
+    # Create directory structure
+    kb_path.mkdir(exist_ok=True)
+    for category in ("mechanics", "strategy", "nations", "resources"):
+        (kb_path / category).mkdir()
+
+    for relative_path, content in _SAMPLE_KNOWLEDGE_FILES:
+        (kb_path / relative_path).write_text(content)
+
+    return kb_path
+
+
+@pytest.fixture(scope="session")
+def temp_knowledge_base(tmp_path_factory) -> Path:
     """
     Create a temporary knowledge base directory with sample files.
 
-    Yields:
+    Built once per test session and shared read-only; tests that write
+    files must use writable_knowledge_base instead.
+
+    Returns:
         Path to temporary knowledge base directory
     """
-    with tempfile.TemporaryDirectory() as tmpdir:
-        kb_path = Path(tmpdir)
+    return _write_sample_knowledge_base(tmp_path_factory.mktemp("knowledge"))
 
-        # Create directory structure
-        mechanics_dir = kb_path / "mechanics"
-        strategy_dir = kb_path / "strategy"
-        nations_dir = kb_path / "nations"
-        resources_dir = kb_path / "resources"
 
-        mechanics_dir.mkdir()
-        strategy_dir.mkdir()
-        nations_dir.mkdir()
-        resources_dir.mkdir()
+@pytest.fixture(scope="session")
+def eu5_knowledge():
+    """
+    Shared EU5Knowledge over the packaged knowledge base.
 
-        # Create sample mechanics files
-        (mechanics_dir / "economy_mechanics.md").write_text(
-            "# Economy Mechanics\n\nTest content for economy mechanics."
-        )
-        (mechanics_dir / "society_mechanics.md").write_text(
-            "# Society Mechanics\n\nTest content for society (estates) mechanics."
-        )
-        (mechanics_dir / "military_mechanics.md").write_text(
-            "# Military Mechanics\n\nTest content for military mechanics."
-        )
+    Loading reads every markdown file, so one read-only instance serves the
+    whole session.
+    """
+    from eu5_agent.knowledge import EU5Knowledge
 
-        # Create sample strategy files
-        (strategy_dir / "beginner_route.md").write_text(
-            "# Beginner's Route\n\nTest guide for beginners."
-        )
-        (strategy_dir / "common_mistakes.md").write_text(
-            "# Common Mistakes\n\nTest list of common mistakes."
-        )
+    return EU5Knowledge()
 
-        # Create sample nation file
-        (nations_dir / "nation_england.md").write_text(
-            "# England Strategy\n\nTest opening strategy for England."
-        )
 
-        # Create resources file
-        (resources_dir / "eu5_resources.md").write_text(
-            "# EU5 Resources\n\nTest list of community resources."
-        )
+@pytest.fixture
+def writable_knowledge_base(tmp_path) -> Path:
+    """
+    Create a private copy of the sample knowledge base for one test.
+
+    Returns:
+        Path to a knowledge base directory the test may modify
+    """
+    return _write_sample_knowledge_base(tmp_path / "knowledge")
+
+
+@pytest.fixture
+def agent_env(monkeypatch, temp_knowledge_base) -> None:
+    """
+    Point EU5Config at a test API key and the sample knowledge base.
+
+    Tests that construct EU5Agent themselves (custom model, extra env vars)
+    request this; set any further variables before building the agent.
+    """
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
+    monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+
+
+@pytest.fixture
+def agent(agent_env, monkeypatch):
+    """
+    Create a fresh EU5Agent over the sample knowledge base with a stub client.
+
+    Building the real OpenAI client loads the system CA bundle, which was
+    most of the cost of constructing an agent; tests replace
+    ``client.chat.completions.create`` with their own Mock anyway.
+
+    Returns:
+        EU5Agent whose ``client`` is a Mock
+    """
+    from eu5_agent.agent import EU5Agent
 
-        yield kb_path
+    monkeypatch.setattr("eu5_agent.agent.OpenAI", Mock())
+
+    return EU5Agent()
+
+
+@pytest.fixture
+def mock_wiki_search(monkeypatch) -> Mock:
+    """
+    Replace search_eu5_wiki with a Mock that finds nothing.
+
+    The agent imports the function at call time, so patching the search
+    module covers every web_search tool call. Set ``return_value`` or
+    ``side_effect`` on the returned Mock to script results.
+    """
+    search = Mock(return_value=[])
+    monkeypatch.setattr("eu5_agent.search.search_eu5_wiki", search)
+    return search
 
 
 @pytest.fixture
@@ -121,15 +205,7 @@ def clean_env(monkeypatch) -> None:
     Removes all EU5 and OpenAI related environment variables
     and prevents .env file loading.
     """
-    env_vars = [
-        "OPENAI_API_KEY",
-        "OPENAI_MODEL",
-        "OPENAI_BASE_URL",
-        "EU5_KNOWLEDGE_PATH",
-        "TAVILY_API_KEY",
-    ]
-
-    for var in env_vars:
+    for var in _CONFIG_ENV_VARS:
         monkeypatch.delenv(var, raising=False)
 
     # Prevent .env file loading during tests
@@ -144,17 +220,27 @@ def mock_env(monkeypatch) -> Dict[str, str]:
     Returns:
         Dictionary of environment variables set
     """
-    env_vars = {
-        "OPENAI_API_KEY": "sk-test-key-12345",
-        "OPENAI_MODEL": "gpt-5-mini",
-        "OPENAI_BASE_URL": "https://api.openai.com/v1",
-        "TAVILY_API_KEY": "tvly-test-key-12345",
-    }
-
-    for key, value in env_vars.items():
+    for key, value in _MOCK_ENV.items():
         monkeypatch.setenv(key, value)
 
-    return env_vars
+    return dict(_MOCK_ENV)
+
+
+@dataclass(slots=True)
+class _ToolCallFunction:
+    """Function part of a tool call, shaped like the SDK's."""
+
+    name: str
+    arguments: str
+
+
+@dataclass(slots=True)
+class _ToolCall:
+    """Assistant tool call, shaped like the SDK's ChatCompletionMessageToolCall."""
+
+    id: str
+    function: _ToolCallFunction
+    type: str = "function"
 
 
 @pytest.fixture
@@ -172,14 +258,7 @@ def sample_tool_call():
             function_name: Name of the function being called
             arguments: JSON string of function arguments
         """
-        tool_call = Mock()
-        tool_call.id = "call_test123"
-        tool_call.function = Mock()
-        tool_call.function.name = function_name
-        tool_call.function.arguments = arguments
-        tool_call.type = "function"
-
-        return tool_call
+        return _ToolCall(id="call_test123", function=_ToolCallFunction(function_name, arguments))
 
     return _create_tool_call
 
@@ -189,10 +268,23 @@ def reset_config_singleton():
     """
     Reset the config singleton between tests.
 
-    This ensures each test gets a fresh configuration instance.
+    This ensures each test gets a fresh configuration instance. It stays
+    autouse: most agent tests read config indirectly through EU5Agent, and
+    a reset is a single global assignment.
     """
-    from eu5_agent.config import reset_config
-
     reset_config()
     yield
     reset_config()
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """
+    Clear the LLM response cache between tests.
+
+    Many tests send identical requests through fresh mocks; without this a
+    cached answer from an earlier test would bypass the mocked client.
+    """
+    response_cache.clear()
+    yield
+    response_cache.clear()
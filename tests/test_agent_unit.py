@@ -10,37 +10,43 @@ Tests cover:
 - Mocked OpenAI API responses to avoid real API calls
 """
 
+import asyncio
 import json
 import logging
+import subprocess
+import sys
+import threading
+import time
 from typing import cast
 from unittest.mock import Mock, patch
 
 import pytest
-from openai.types.chat import ChatCompletionMessageParam
-
-from eu5_agent.agent import EU5Agent
+from openai.types.chat import ChatCompletionMessage, ChatCompletionMessageParam
+
+from eu5_agent.agent import (
+    _COMPLEX_MODE_MESSAGE,
+    TOOL_RESULT_TRUNCATION_NOTE,
+    EU5Agent,
+    _assistant_message_to_dict,
+    _install_fast_request_json,
+    _parse_tool_arguments,
+)
 from eu5_agent.config import EU5Config
 
 
 class TestAgentInitialization:
     """Tests for EU5Agent initialization."""
 
-    def test_init_with_api_key(self, temp_knowledge_base, monkeypatch):
+    def test_init_with_api_key(self, agent_env):
         """Test agent initialization with API key."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
         agent = EU5Agent()
 
         assert agent.api_key == "sk-test-key"
         assert agent.model == "gpt-5-mini"
         assert agent.knowledge is not None
 
-    def test_init_with_custom_model(self, temp_knowledge_base, monkeypatch):
+    def test_init_with_custom_model(self, agent_env):
         """Test agent initialization with custom model."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
         agent = EU5Agent(model="gpt-4o")
 
         assert agent.model == "gpt-4o"
@@ -64,13 +70,8 @@ class TestAgentInitialization:
         assert agent.api_key == "sk-custom-key"
         assert agent.model == "gpt-4o"
 
-    def test_init_creates_message_history(self, temp_knowledge_base, monkeypatch):
+    def test_init_creates_message_history(self, agent):
         """Test that initialization creates message history with system prompt."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-
         assert len(agent.messages) == 1
         assert agent.messages[0]["role"] == "system"
         content = agent.messages[0]["content"]
@@ -78,16 +79,35 @@ class TestAgentInitialization:
         assert len(content) > 0
 
 
-class TestConversationHistory:
-    """Tests for conversation history management."""
+class TestLazyOpenAIImport:
+    """The OpenAI SDK is imported when the first agent is built, not on module import."""
 
-    def test_reset_clears_history(self, temp_knowledge_base, monkeypatch):
-        """Test that reset clears conversation history."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+    def test_module_import_does_not_load_openai(self):
+        """Importing eu5_agent.agent leaves the SDK unloaded."""
+        code = "import sys, eu5_agent.agent; print('openai' in sys.modules)"
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, check=True
+        )
+        assert result.stdout.strip() == "False"
+
+    def test_openai_loaded_on_first_agent(self, agent_env, monkeypatch):
+        """Building an agent fills in eu5_agent.agent.OpenAI with the SDK class."""
+        from openai import OpenAI
+
+        import eu5_agent.agent as agent_module
 
+        monkeypatch.setattr(agent_module, "OpenAI", None)
         agent = EU5Agent()
 
+        assert agent_module.OpenAI is OpenAI
+        assert isinstance(agent.client, OpenAI)
+
+
+class TestConversationHistory:
+    """Tests for conversation history management."""
+
+    def test_reset_clears_history(self, agent):
+        """Test that reset clears conversation history."""
         # Add some messages
         agent.messages.append({"role": "user", "content": "test"})
         agent.messages.append({"role": "assistant", "content": "response"})
@@ -100,13 +120,15 @@ class TestConversationHistory:
         assert len(agent.messages) == 1
         assert agent.messages[0]["role"] == "system"
 
-    def test_chat_adds_to_history(self, temp_knowledge_base, monkeypatch, mock_openai_response):
-        """Test that chat adds messages to history."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+    def test_history_is_list(self, agent):
+        """History stays a plain list, so callers can slice it."""
+        agent.messages.append({"role": "user", "content": "test"})
 
-        agent = EU5Agent()
+        assert isinstance(agent.messages, list)
+        assert agent.messages[-1:] == [{"role": "user", "content": "test"}]
 
+    def test_chat_adds_to_history(self, agent, mock_openai_response):
+        """Test that chat adds messages to history."""
         # Mock the OpenAI client
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("Test response")
@@ -124,111 +146,80 @@ class TestConversationHistory:
 class TestToolExecution:
     """Tests for tool execution functionality."""
 
-    def test_query_knowledge_tool(self, temp_knowledge_base, monkeypatch):
+    def test_query_knowledge_tool(self, agent):
         """Test knowledge query tool execution."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
         result = agent._query_knowledge("mechanics", "economy")
 
         assert "Economy Mechanics" in result
         assert "Local Knowledge Base" in result
 
-    def test_query_knowledge_invalid_category(self, temp_knowledge_base, monkeypatch):
-        """Test knowledge query with invalid category."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+    def test_query_knowledge_reuses_formatted_output(self, agent):
+        """Repeat lookups of a cached file return the same tool output string."""
+        first = agent._query_knowledge("mechanics", "economy")
 
-        agent = EU5Agent()
+        assert agent._query_knowledge("mechanics", "economy") is first
+
+    def test_query_knowledge_invalid_category(self, agent):
+        """Test knowledge query with invalid category."""
         result = agent._query_knowledge("invalid_cat", "test")
 
         assert "Error" in result
 
-    def test_web_search_tool(self, temp_knowledge_base, monkeypatch):
+    def test_web_search_tool(self, agent_env, monkeypatch, mock_wiki_search):
         """Test web search tool execution."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
 
         agent = EU5Agent()
+        mock_wiki_search.return_value = [
+            {"title": "Test", "url": "http://test.com", "snippet": "test content"}
+        ]
 
-        # Mock the search function where it's imported
-        with patch("eu5_agent.search.search_eu5_wiki") as mock_search:
-            mock_search.return_value = [
-                {"title": "Test", "url": "http://test.com", "snippet": "test content"}
-            ]
-
-            result = agent._web_search("test query")
+        result = agent._web_search("test query")
 
         assert "Web Search" in result
         assert "Test" in result
 
-    def test_web_search_error_handling(self, temp_knowledge_base, monkeypatch):
+    def test_web_search_error_handling(self, agent, mock_wiki_search):
         """Test web search error handling."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
+        mock_wiki_search.side_effect = Exception("API Error")
 
-        # Mock search to raise an error
-        with patch("eu5_agent.search.search_eu5_wiki", side_effect=Exception("API Error")):
-            result = agent._web_search("test query")
+        result = agent._web_search("test query")
 
         assert "error" in result.lower()
 
-    def test_execute_tool_call_knowledge(self, temp_knowledge_base, monkeypatch, sample_tool_call):
-        """Test executing a knowledge query tool call."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-        tool_call = sample_tool_call(
-            "query_knowledge", '{"category": "mechanics", "subcategory": "economy"}'
-        )
-
-        result = agent._execute_tool_call(tool_call)
-
-        assert len(result) > 0
-        assert "Economy" in result or "Error" in result
-
-    def test_execute_tool_call_web_search(self, temp_knowledge_base, monkeypatch, sample_tool_call):
-        """Test executing a web search tool call."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-        tool_call = sample_tool_call("web_search", '{"query": "test"}')
-
-        with patch("eu5_agent.search.search_eu5_wiki", return_value=[]):
-            result = agent._execute_tool_call(tool_call)
-
-        assert "No results" in result or "error" in result.lower()
-
-    def test_execute_tool_call_unknown_tool(
-        self, temp_knowledge_base, monkeypatch, sample_tool_call
+    @pytest.mark.parametrize(
+        "function_name, arguments, expected",
+        [
+            (
+                "query_knowledge",
+                '{"category": "mechanics", "subcategory": "economy"}',
+                ["economy mechanics"],
+            ),
+            ("query_knowledge", '{"category": "invalid", "subcategory": "x"}', ["error"]),
+            ("web_search", '{"query": "test"}', ["no results"]),
+            ("unknown_tool", "{}", ["unknown tool"]),
+            ("query_knowledge", "invalid json", ["invalid tool arguments", "json decode failed"]),
+            ("web_search", '{"num_results": 2}', ["missing 'query'"]),
+        ],
+        ids=["knowledge", "invalid-category", "web-search", "unknown-tool", "bad-json", "missing-arg"],
+    )
+    def test_execute_tool_call(
+        self, agent, sample_tool_call, mock_wiki_search, function_name, arguments, expected
     ):
-        """Test executing an unknown tool call."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+        """Tool calls dispatch to their handler; failures come back as messages."""
+        tool_call = sample_tool_call(function_name, arguments)
 
-        agent = EU5Agent()
-        tool_call = sample_tool_call("unknown_tool", "{}")
+        result = agent._execute_tool_call(tool_call).lower()
 
-        result = agent._execute_tool_call(tool_call)
-
-        assert "Unknown tool" in result
+        for text in expected:
+            assert text in result
 
 
 class TestChatFunctionality:
     """Tests for chat functionality."""
 
-    def test_chat_simple_response(self, temp_knowledge_base, monkeypatch, mock_openai_response):
+    def test_chat_simple_response(self, agent, mock_openai_response):
         """Test simple chat without tool calls."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("Simple answer")
         )
@@ -238,14 +229,9 @@ class TestChatFunctionality:
         assert response == "Simple answer"
 
     def test_chat_with_tool_calls(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response, sample_tool_call
+        self, agent, mock_openai_response, sample_tool_call
     ):
         """Test chat with tool calls."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-
         # First response has tool call
         tool_call = sample_tool_call(
             "query_knowledge", '{"category": "mechanics", "subcategory": "economy"}'
@@ -263,14 +249,157 @@ class TestChatFunctionality:
 
         assert "Based on the knowledge" in response
 
-    def test_chat_max_iterations(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response, sample_tool_call
+    def test_chat_runs_parallel_tool_calls_concurrently(
+        self, agent, mock_openai_response, sample_tool_call
     ):
-        """Test that chat respects max iterations limit."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+        """Several tool calls in one turn run concurrently; results keep request order."""
+        first = sample_tool_call("web_search", '{"query": "estates"}')
+        first.id = "call_1"
+        second = sample_tool_call("web_search", '{"query": "trade"}')
+        second.id = "call_2"
+
+        # Each call waits for the other to start, so this only passes if
+        # both run at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        def _fake_execute(tool_call):
+            barrier.wait()
+            return f"result for {tool_call.id}"
+
+        agent._execute_tool_call = _fake_execute  # type: ignore[method-assign]
+        agent.client.chat.completions.create = Mock(side_effect=[
+            mock_openai_response(content=None, tool_calls=[first, second]),
+            mock_openai_response("done"),
+        ])
+
+        assert agent.chat("test") == "done"
+
+        tool_messages = [m for m in agent.messages if m["role"] == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2"]
+        assert [m["content"] for m in tool_messages] == [
+            "result for call_1", "result for call_2"
+        ]
+
+    def test_parallel_knowledge_calls_are_batched_and_deduplicated(
+        self, agent, sample_tool_call
+    ):
+        """Repeated query_knowledge calls in one turn are looked up once each."""
+        economy = '{"category": "mechanics", "subcategory": "economy"}'
+        tool_calls = [
+            sample_tool_call("query_knowledge", economy),
+            sample_tool_call("query_knowledge", '{"category": "strategy", "subcategory": "beginner_route"}'),
+            sample_tool_call("query_knowledge", economy),
+            sample_tool_call("query_knowledge", '{"category": "bogus"}'),
+        ]
+
+        with patch.object(
+            agent.knowledge, "get_knowledge", wraps=agent.knowledge.get_knowledge
+        ) as spy:
+            results = agent._execute_tool_calls(tool_calls)
+
+        # economy, beginner_route and the invalid category, once each
+        assert spy.call_count == 3
+        assert results[0] == results[2]
+        assert "Economy Mechanics" in results[0]
+        assert "mechanics/economy" in results[0]
+        assert "strategy/beginner_route" in results[1]
+        assert results[3].startswith("Error: Invalid category")
+
+    def test_tool_batch_timeout_is_shared_by_all_calls(
+        self, agent, sample_tool_call, monkeypatch
+    ):
+        """Stuck calls time out together against one deadline, not one each."""
+        monkeypatch.setattr("eu5_agent.agent.TOOL_CALL_TIMEOUT", 0.3)
+        release = threading.Event()
+
+        def _fake_execute(tool_call):
+            if "fast" in tool_call.function.arguments:
+                return "fast result"
+            release.wait(5)
+            return "too late"
+
+        agent._execute_tool_call = _fake_execute  # type: ignore[method-assign]
+        tool_calls = [
+            sample_tool_call("web_search", '{"query": "stuck one"}'),
+            sample_tool_call("web_search", '{"query": "fast"}'),
+            sample_tool_call("web_search", '{"query": "stuck two"}'),
+        ]
+
+        start = time.monotonic()
+        try:
+            results = agent._execute_tool_calls(tool_calls)
+        finally:
+            release.set()
+            agent.close()
+
+        assert time.monotonic() - start < 0.55
+        assert results[1] == "fast result"
+        for result in (results[0], results[2]):
+            assert result == "Error: tool 'web_search' timed out after 0.3s"
+
+    def test_close_shuts_down_tool_executor(self, agent, sample_tool_call):
+        """close() stops the tool thread pool; later batches start a new one."""
+        tool_calls = [
+            sample_tool_call("web_search", '{"query": "estates"}'),
+            sample_tool_call("web_search", '{"query": "trade"}'),
+        ]
+        agent._execute_tool_call = lambda tool_call: "ok"  # type: ignore[method-assign]
+        agent._execute_tool_calls(tool_calls)
+        executor = agent._tool_executor
+        assert executor is not None
+
+        agent.close()
+
+        assert agent._tool_executor is None
+        with pytest.raises(RuntimeError):
+            executor.submit(print)
+        assert agent._execute_tool_calls(tool_calls) == ["ok", "ok"]
+        agent.close()
+
+    def test_context_manager_closes_agent(self, agent):
+        """Leaving a with block closes the agent."""
+        with patch.object(agent, "close", wraps=agent.close) as close, agent as entered:
+            assert entered is agent
+
+        close.assert_called_once_with()
+
+    def test_oversized_tool_result_truncated_in_history(
+        self, agent_env, monkeypatch, mock_openai_response, sample_tool_call
+    ):
+        """Tool results over max_tool_result_chars are cut before entering history."""
+        monkeypatch.setenv("EU5_MAX_TOOL_RESULT_CHARS", "50")
 
         agent = EU5Agent()
+        agent.client.chat.completions.create = Mock(side_effect=[
+            mock_openai_response(content=None, tool_calls=[sample_tool_call()]),
+            mock_openai_response("done"),
+        ])
+
+        agent.chat("How does economy work?")
+
+        tool_message = next(m for m in agent.messages if m["role"] == "tool")
+        content = cast(str, tool_message["content"])
+        assert content.endswith(TOOL_RESULT_TRUNCATION_NOTE)
+        assert len(content) == 50 + len(TOOL_RESULT_TRUNCATION_NOTE)
+
+    def test_chat_async_matches_chat(
+        self, agent, mock_openai_response
+    ):
+        """chat_async() is an awaitable wrapper around the same chat loop."""
+        agent.client.chat.completions.create = Mock(
+            return_value=mock_openai_response("Async answer")
+        )
+
+        assert asyncio.run(agent.chat_async("How do estates work?")) == "Async answer"
+        assert agent.messages[-1]["content"] == "Async answer"
+
+    def test_chat_max_iterations(
+        self, agent, monkeypatch, mock_openai_response, sample_tool_call
+    ):
+        """Test that chat respects max iterations limit."""
+        # A low cap and stubbed tools keep the forced loop short
+        monkeypatch.setattr("eu5_agent.agent.MAX_TOOL_ITERATIONS", 2)
+        monkeypatch.setattr(agent, "_execute_tool_call", lambda tool_call: "stub")
 
         # Always return tool calls to force max iterations
         tool_call = sample_tool_call()
@@ -282,40 +411,132 @@ class TestChatFunctionality:
 
         # Should return max iterations message
         assert "maximum number of research steps" in response.lower()
+        assert agent.client.chat.completions.create.call_count == 2
 
     def test_chat_verbose_mode(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response, caplog
+        self, agent, mock_openai_response, sample_tool_call, caplog
+    ):
+        """Verbose chat logs each tool call and a preview of its result."""
+        caplog.set_level(logging.INFO, logger="eu5_agent.agent")
+
+        agent.client.chat.completions.create = Mock(side_effect=[
+            mock_openai_response(content=None, tool_calls=[sample_tool_call()]),
+            mock_openai_response("Test response"),
+        ])
+
+        agent.chat("test question", verbose=True)
+
+        assert "[Tool Calls: 1]" in caplog.text
+        assert "query_knowledge(" in caplog.text
+        assert "Result: " in caplog.text
+
+    def test_chat_quiet_by_default(
+        self, agent, mock_openai_response, sample_tool_call, caplog
+    ):
+        """Without verbose, tool calls are not logged."""
+        caplog.set_level(logging.INFO, logger="eu5_agent.agent")
+
+        agent.client.chat.completions.create = Mock(side_effect=[
+            mock_openai_response(content=None, tool_calls=[sample_tool_call()]),
+            mock_openai_response("Test response"),
+        ])
+
+        agent.chat("test question")
+
+        assert "Tool Calls" not in caplog.text
+
+
+class TestResponseCache:
+    """Tests for reuse of final answers across identical requests."""
+
+    @pytest.fixture(autouse=True)
+    def enable_response_cache(self, monkeypatch):
+        """The cache is opt-in; turn it on before the agent is built."""
+        monkeypatch.setenv("EU5_RESPONSE_CACHE", "true")
+
+    def test_identical_request_served_from_cache(
+        self, agent, mock_openai_response
     ):
-        """Test chat verbose mode logging."""
-        import logging
+        """A repeated identical request does not call the API again."""
+        agent.client.chat.completions.create = Mock(
+            return_value=mock_openai_response("Cached answer")
+        )
 
-        caplog.set_level(logging.INFO)
+        assert agent.chat("How do estates work?") == "Cached answer"
+        agent.reset()
+        assert agent.chat("How do estates work?") == "Cached answer"
+
+        assert agent.client.chat.completions.create.call_count == 1
+        assert agent.messages[-1]["content"] == "Cached answer"
 
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+    def test_tool_call_turns_not_cached(
+        self, agent, mock_openai_response, sample_tool_call
+    ):
+        """Only final answers are cached; tool-call turns always hit the API."""
+        tool_response = mock_openai_response(content=None, tool_calls=[sample_tool_call()])
+        final_response = mock_openai_response("Final answer")
+        agent.client.chat.completions.create = Mock(
+            side_effect=[tool_response, final_response, tool_response, final_response]
+        )
+
+        agent.chat("How does economy work?")
+        agent.reset()
+        agent.chat("How does economy work?")
+
+        # Second chat replays the tool-call turn, then reuses the final answer
+        assert agent.client.chat.completions.create.call_count == 3
+
+    def test_cache_disabled_by_config(
+        self, agent_env, monkeypatch, mock_openai_response
+    ):
+        """EU5_RESPONSE_CACHE=false sends every request to the API."""
+        monkeypatch.setenv("EU5_RESPONSE_CACHE", "false")
 
         agent = EU5Agent()
         agent.client.chat.completions.create = Mock(
-            return_value=mock_openai_response("Test response")
+            return_value=mock_openai_response("Answer")
         )
 
-        agent.chat("test question", verbose=True)
+        agent.chat("How do estates work?")
+        agent.reset()
+        agent.chat("How do estates work?")
+
+        assert agent.client.chat.completions.create.call_count == 2
+
+    def test_cache_key_covers_tools_and_params(self, agent):
+        """Keys are stable for identical requests and change with tools or messages."""
+        from eu5_agent.prompts import TOOLS
 
-        # Verbose mode should log, but since we're not making tool calls,
-        # just verify the chat completes successfully
-        assert True  # Test passes if no exception
+        params = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}], "tools": TOOLS}
+        key = agent._response_cache_key(params)
+
+        assert agent._response_cache_key(dict(params)) == key
+        assert params["tools"] is TOOLS  # caller's dict is left untouched
+        assert agent._response_cache_key({**params, "tools": TOOLS[:1]}) != key
+        assert agent._response_cache_key(
+            {**params, "messages": [{"role": "user", "content": "hello"}]}
+        ) != key
+
+    def test_cache_key_covers_endpoint_and_api_key(self, agent):
+        """Agents on another server or account never share cached answers."""
+        params = {"model": "gpt-4o", "messages": [{"role": "user", "content": "hi"}]}
+        local_config = EU5Config()
+        local_config.base_url = "http://localhost:8080/v1"
+
+        key = agent._response_cache_key(params)
+
+        assert EU5Agent()._response_cache_key(params) == key
+        assert EU5Agent(api_key="sk-other-key")._response_cache_key(params) != key
+        assert EU5Agent(config=local_config)._response_cache_key(params) != key
 
 
 class TestModelSpecificAPIParams:
     """Tests for conditional API parameters based on model capabilities."""
 
     def test_gpt5_sends_max_completion_tokens_not_temperature(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent_env, mock_openai_response
     ):
         """Test that gpt-5 model sends max_completion_tokens but not temperature."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
         agent = EU5Agent(model="gpt-5-mini")
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("response")
@@ -330,12 +551,9 @@ class TestModelSpecificAPIParams:
         assert "temperature" not in all_args
 
     def test_gpt4_sends_temperature_not_max_completion_tokens(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent_env, mock_openai_response
     ):
         """Test that gpt-4 model sends temperature but not max_completion_tokens."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
         agent = EU5Agent(model="gpt-4o")
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("response")
@@ -350,12 +568,10 @@ class TestModelSpecificAPIParams:
         assert "max_completion_tokens" not in all_args
 
     def test_model_override_uses_effective_model_not_config(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent_env, monkeypatch, mock_openai_response
     ):
         """Test that model override via constructor determines API params, not config."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
         monkeypatch.setenv("OPENAI_MODEL", "gpt-5-mini")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
 
         # Override to gpt-4o — should send temperature, not max_completion_tokens
         agent = EU5Agent(model="gpt-4o")
@@ -371,13 +587,11 @@ class TestModelSpecificAPIParams:
         assert "max_completion_tokens" not in all_args
 
     def test_configurable_temperature_value(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent_env, monkeypatch, mock_openai_response
     ):
         """Test that custom temperature from env is passed to the API."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
         monkeypatch.setenv("OPENAI_MODEL", "gpt-4o")
         monkeypatch.setenv("OPENAI_TEMPERATURE", "0.3")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
 
         agent = EU5Agent()
         agent.client.chat.completions.create = Mock(
@@ -391,15 +605,145 @@ class TestModelSpecificAPIParams:
         assert all_args["temperature"] == 0.3
 
 
+class TestToolArgumentParsing:
+    """Tests for the tool-argument fast-path parser."""
+
+    @pytest.mark.parametrize(
+        "function_name, raw",
+        [
+            ("query_knowledge", '{"category": "mechanics", "subcategory": "economy"}'),
+            ("query_knowledge", '{"category":"nations"}'),
+            ("query_knowledge", '{"subcategory": "england", "category": "nations"}'),
+            ("query_knowledge", '{"category": "mechanics", "subcategory": null}'),
+            ("web_search", '{"query": "France opening", "num_results": 5}'),
+            ("web_search", '{"query": "Quote \\"inside\\" query"}'),
+            ("web_search", '{"query": "Bohème", "extra": true}'),
+            ("unknown_tool", '{"anything": [1, 2]}'),
+        ],
+    )
+    def test_matches_json_loads(self, function_name, raw):
+        """Fast-path results must be identical to a full JSON parse."""
+        assert _parse_tool_arguments(function_name, raw) == json.loads(raw)
+
+    def test_invalid_json_still_raises(self):
+        """Malformed input falls through to the JSON parser and raises."""
+        with pytest.raises(json.JSONDecodeError):
+            _parse_tool_arguments("query_knowledge", '{"category": "mechanics"')
+
+
+class TestFastRequestJson:
+    """Tests for the orjson request-body encoder hook."""
+
+    @pytest.fixture
+    def base_client(self, monkeypatch):
+        """The SDK module the hook patches, restored after the test."""
+        from openai import _base_client
+
+        monkeypatch.setattr(_base_client, "openapi_dumps", _base_client.openapi_dumps)
+        return _base_client
+
+    def test_hook_is_opt_in(self, agent_env, base_client):
+        """By default an agent leaves the SDK's encoder alone."""
+        original = base_client.openapi_dumps
+
+        EU5Agent()
+
+        assert base_client.openapi_dumps is original
+
+    def test_request_body_round_trips(self, agent_env, base_client, monkeypatch):
+        """Requests sent through the SDK carry the same JSON body with the hook active."""
+        pytest.importorskip("orjson")
+        import httpx
+        from openai import OpenAI
+        from openai._utils._json import openapi_dumps
+
+        monkeypatch.setenv("EU5_FAST_REQUEST_JSON", "true")
+        EU5Agent()  # installs the hook
+        assert base_client.openapi_dumps.__name__ == "_orjson_openapi_dumps"
+        assert _install_fast_request_json() is True
+
+        sent = []
+
+        def handler(request):
+            sent.append(request.content)
+            return httpx.Response(200, json={
+                "id": "chatcmpl-1", "object": "chat.completion", "created": 0, "model": "m",
+                "choices": [{
+                    "index": 0, "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "ok"},
+                }],
+            })
+
+        client = OpenAI(api_key="sk-test-key", http_client=httpx.Client(transport=httpx.MockTransport(handler)))
+        messages = [{"role": "user", "content": "Résumé of estates \u2014 \"quoted\"\n"}]
+        client.chat.completions.create(model="m", messages=messages)  # type: ignore[arg-type]
+
+        assert json.loads(sent[0]) == json.loads(openapi_dumps({"messages": messages, "model": "m"}))
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf")], ids=["nan", "inf"])
+    def test_non_finite_parameter_raises_like_sdk(self, base_client, value):
+        """Non-finite floats still raise instead of being sent as null."""
+        pytest.importorskip("orjson")
+        assert _install_fast_request_json() is True
+
+        with pytest.raises(ValueError):
+            base_client.openapi_dumps({"model": "m", "temperature": value})
+
+
+class TestAssistantMessageConversion:
+    """Tests for the direct SDK message -> history dict conversion."""
+
+    def test_matches_sdk_dump_for_tool_calls(self):
+        """The minimal dict carries the same role/content/tool_calls as model_dump()."""
+        message = ChatCompletionMessage.model_validate({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [{
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "query_knowledge", "arguments": '{"category": "mechanics"}'},
+            }],
+        })
+
+        expected = message.model_dump(exclude_unset=True)
+        assert _assistant_message_to_dict(message) == {
+            key: expected[key] for key in ("role", "content", "tool_calls")
+        }
+
+    def test_provider_extra_fields_survive(self):
+        """Extra provider fields (Gemini thought signatures) are replayed as received."""
+        signature = {"google": {"thought_signature": "sig-abc"}}
+        message = ChatCompletionMessage.model_validate({
+            "role": "assistant",
+            "content": None,
+            "reasoning_content": "thinking",
+            "tool_calls": [{
+                "id": "call_1",
+                "type": "function",
+                "function": {"name": "query_knowledge", "arguments": '{"category": "mechanics"}'},
+                "extra_content": signature,
+            }],
+        })
+
+        result = _assistant_message_to_dict(message)
+
+        assert result["tool_calls"][0]["extra_content"] == signature
+        assert result["reasoning_content"] == "thinking"
+        assert result == message.model_dump(exclude_unset=True)
+
+    def test_final_answer_has_no_tool_calls_key(self):
+        """Plain answers carry only role and content."""
+        message = ChatCompletionMessage.model_validate(
+            {"role": "assistant", "content": "Answer"}
+        )
+        assert _assistant_message_to_dict(message) == {"role": "assistant", "content": "Answer"}
+
+
 class TestErrorHandling:
     """Tests for error handling in agent."""
 
-    def test_chat_handles_openai_error(self, temp_knowledge_base, monkeypatch):
+    def test_chat_handles_openai_error(self, agent):
         """Test that chat handles OpenAI API errors."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
         agent.client.chat.completions.create = Mock(side_effect=Exception("API Error"))
 
         with pytest.raises(Exception) as exc_info:
@@ -407,123 +751,29 @@ class TestErrorHandling:
 
         assert "API Error" in str(exc_info.value)
 
-    def test_tool_execution_error_returns_message(self, temp_knowledge_base, monkeypatch):
-        """Test that tool execution errors return error messages."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-
-        # Create a tool call with invalid JSON
-        tool_call = Mock()
-        tool_call.function.name = "query_knowledge"
-        tool_call.function.arguments = "invalid json"
-
-        result = agent._execute_tool_call(tool_call)
-
-        assert "invalid tool arguments" in result.lower()
-        assert "json decode failed" in result.lower()
-
-    def test_tool_execution_missing_required_args(self, temp_knowledge_base, monkeypatch):
-        """Test that missing required args returns a clear error."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-
-        tool_call = Mock()
-        tool_call.function.name = "web_search"
-        tool_call.function.arguments = json.dumps({"num_results": 2})
-
-        result = agent._execute_tool_call(tool_call)
-
-        assert "missing 'query'" in result.lower()
-
 
 class TestAgentIntegration:
     """Integration tests for full agent workflows."""
 
-    def test_full_chat_workflow(self, temp_knowledge_base, monkeypatch):
-        """Test complete chat workflow from question to answer."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+    def test_conversation_lifecycle(self, agent, mock_openai_response):
+        """Chats accumulate history until reset, then start fresh."""
+        agent.client.chat.completions.create = Mock(side_effect=[
+            mock_openai_response("Answer 1"),
+            mock_openai_response("Answer 2"),
+            mock_openai_response("Answer 3"),
+        ])
 
-        agent = EU5Agent()
-
-        # Create mock responses
-        mock_response = Mock()
-        mock_response.choices = [Mock()]
-        mock_response.choices[0].message = Mock()
-        mock_response.choices[0].message.content = "Test answer"
-        mock_response.choices[0].message.tool_calls = None
-        mock_response.choices[0].message.model_dump = Mock(
-            return_value={"role": "assistant", "content": "Test answer"}
-        )
-        mock_response.model = "gpt-5-mini"
-        mock_response.id = "test-id"
-        mock_response.usage = Mock(prompt_tokens=10, completion_tokens=20, total_tokens=30)
-
-        agent.client.chat.completions.create = Mock(return_value=mock_response)
-
-        response = agent.chat("How do estates work?")
-
-        assert response == "Test answer"
-        assert len(agent.messages) > 1  # System + user + assistant
-
-    def test_multiple_conversations(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
-    ):
-        """Test multiple conversations with the same agent."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-        agent.client.chat.completions.create = Mock(return_value=mock_openai_response("Response"))
-
-        # First conversation
-        response1 = agent.chat("Question 1")
-        history_after_1 = len(agent.messages)
-
-        # Second conversation (history should grow)
-        response2 = agent.chat("Question 2")
-        history_after_2 = len(agent.messages)
+        assert agent.chat("How do estates work?") == "Answer 1", "step 1: first answer"
+        assert len(agent.messages) == 3, "step 1: system + user + assistant"
 
-        assert response1 == "Response"
-        assert response2 == "Response"
-        assert history_after_2 > history_after_1
+        assert agent.chat("And the clergy?") == "Answer 2", "step 2: second answer"
+        assert len(agent.messages) == 5, "step 2: history should grow"
 
-    def test_reset_between_conversations(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
-    ):
-        """Test reset clears conversation between chats."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
-        agent.client.chat.completions.create = Mock(return_value=mock_openai_response("Response"))
-
-        # First conversation
-        agent.chat("Question 1")
-        assert len(agent.messages) > 1
-
-        # Reset
         agent.reset()
-        assert len(agent.messages) == 1
-
-        # Second conversation starts fresh
-        agent.chat("Question 2")
-        # Should only have system + user + assistant
-        assert len(agent.messages) == 3
-
-
-def _make_agent(temp_knowledge_base, monkeypatch, max_history=10):
-    """Helper: create an EU5Agent with a configurable max_history_messages."""
-    monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-    monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
+        assert len(agent.messages) == 1, "step 3: reset keeps only the system prompt"
 
-    agent = EU5Agent()
-    agent.max_history_messages = max_history
-    return agent
+        assert agent.chat("How does trade work?") == "Answer 3", "step 4: answer after reset"
+        assert len(agent.messages) == 3, "step 4: new conversation starts fresh"
 
 
 def _msg(role, content="x", **extra):
@@ -536,9 +786,9 @@ def _msg(role, content="x", **extra):
 class TestMessageTrimming:
     """Tests for _trim_messages() turn-group-based history trimming."""
 
-    def test_no_op_when_under_limit(self, temp_knowledge_base, monkeypatch):
+    def test_no_op_when_under_limit(self, agent):
         """No trimming occurs when message count is within the limit."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=20)
+        agent.max_history_messages = 20
         # system + user + assistant = 3 messages, well under 20
         agent.messages = [
             _msg("system", "sys"),
@@ -550,9 +800,9 @@ class TestMessageTrimming:
 
         assert len(agent.messages) == 3
 
-    def test_drops_oldest_turn_group(self, temp_knowledge_base, monkeypatch):
+    def test_drops_oldest_turn_group(self, agent):
         """Oldest turn group is dropped when over the limit."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=5)
+        agent.max_history_messages = 5
         agent.messages = [
             _msg("system", "sys"),       # 0
             _msg("user", "q1"),          # 1  ← oldest turn group
@@ -570,9 +820,9 @@ class TestMessageTrimming:
         assert agent.messages[0]["role"] == "system"
         assert agent.messages[1]["content"] == "q2"
 
-    def test_preserves_tool_call_chains(self, temp_knowledge_base, monkeypatch):
+    def test_preserves_tool_call_chains(self, agent):
         """Assistant tool_calls and subsequent tool results are kept together."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=8)
+        agent.max_history_messages = 8
         agent.messages = [
             _msg("system", "sys"),
             # Turn group 1: user + assistant(tool_call) + tool + assistant
@@ -598,9 +848,9 @@ class TestMessageTrimming:
         assert agent.messages[3]["role"] == "tool"
         assert agent.messages[4]["content"] == "a2"
 
-    def test_system_prompt_always_preserved(self, temp_knowledge_base, monkeypatch):
+    def test_system_prompt_always_preserved(self, agent):
         """System prompt at index 0 is never removed."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=3)
+        agent.max_history_messages = 3
         agent.messages = [
             _msg("system", "sys"),
             _msg("user", "q1"),
@@ -614,9 +864,9 @@ class TestMessageTrimming:
         assert agent.messages[0]["role"] == "system"
         assert agent.messages[0]["content"] == "sys"
 
-    def test_never_drops_last_turn_group(self, temp_knowledge_base, monkeypatch):
+    def test_never_drops_last_turn_group(self, agent):
         """The most recent turn group is never dropped, even if over limit."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=2)
+        agent.max_history_messages = 2
         # Even with limit=2, we can't drop the only user turn group
         agent.messages = [
             _msg("system", "sys"),
@@ -630,9 +880,9 @@ class TestMessageTrimming:
         assert len(agent.messages) == 3
         assert agent.messages[1]["content"] == "q1"
 
-    def test_drops_multiple_groups_when_needed(self, temp_knowledge_base, monkeypatch):
+    def test_drops_multiple_groups_when_needed(self, agent):
         """Multiple old turn groups are dropped to get under the limit."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=4)
+        agent.max_history_messages = 4
         agent.messages = [
             _msg("system", "sys"),
             _msg("user", "q1"),
@@ -653,9 +903,24 @@ class TestMessageTrimming:
         # Last turn group must survive
         assert any(m["content"] == "q4" for m in agent.messages)
 
-    def test_logs_warning_on_trim(self, temp_knowledge_base, monkeypatch, caplog):
+    def test_turn_index_tracks_appends_across_trims(self, agent):
+        """User-turn boundaries stay correct as history grows and is trimmed."""
+        agent.max_history_messages = 5
+
+        for turn in range(6):
+            agent.messages.append(_msg("user", f"q{turn}"))
+            agent.messages.append(_msg("assistant", f"a{turn}"))
+            agent._trim_messages()
+
+            expected = [i for i, m in enumerate(agent.messages) if m["role"] == "user"]
+            assert list(agent._user_turn_indices()) == expected
+
+        assert len(agent.messages) <= 5
+        assert agent.messages[-1]["content"] == "a5"
+
+    def test_logs_warning_on_trim(self, agent, caplog):
         """A warning is logged when messages are trimmed."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=4)
+        agent.max_history_messages = 4
         agent.messages = [
             _msg("system", "sys"),
             _msg("user", "q1"),
@@ -671,10 +936,10 @@ class TestMessageTrimming:
         assert "old messages" in caplog.text
 
     def test_trim_called_during_chat(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent, mock_openai_response
     ):
         """_trim_messages() is invoked inside chat()."""
-        agent = _make_agent(temp_knowledge_base, monkeypatch, max_history=100)
+        agent.max_history_messages = 100
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("reply")
         )
@@ -717,21 +982,27 @@ class TestComplexQueryMode:
         )
         assert EU5Agent._is_complex_query(query) is False
 
+    def test_signals_match_as_overlapping_substrings(self):
+        """Signals match inside words and overlap ("15 year" also counts "5 year")."""
+        # 15 year (2) + 5 year (2) from a single phrase
+        assert EU5Agent._is_complex_query("A 15 year outlook") is True
+        # "risks" and "planning" contain the weak signals "risk" and "plan",
+        # plus one conjunction
+        assert EU5Agent._is_complex_query("risks and planning") is True
+        assert EU5Agent._is_complex_query("risks planning") is False
+
     def test_complex_mode_instruction_contains_required_sections(self):
         """Complex mode runtime guidance should include section requirements."""
-        instruction = EU5Agent._complex_mode_instruction()
+        assert _COMPLEX_MODE_MESSAGE["role"] == "system"
+        instruction = _COMPLEX_MODE_MESSAGE["content"]
         assert "[Complex Query Mode Enabled]" in instruction
         assert "Situation Snapshot" in instruction
         assert "First 3 Actions" in instruction
 
     def test_chat_uses_complex_runtime_message_when_triggered(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent, mock_openai_response
     ):
         """chat() should send shaped complex-mode content to the API."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("response")
         )
@@ -750,13 +1021,9 @@ class TestComplexQueryMode:
         assert "[Complex Query Mode Enabled]" in sent_messages[1]["content"]
 
     def test_chat_does_not_inject_complex_instruction_for_simple_query(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent, mock_openai_response
     ):
         """Simple prompts should send only the base system + raw user message."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("response")
         )
@@ -771,14 +1038,27 @@ class TestComplexQueryMode:
         assert sent_messages[0]["role"] == "system"
         assert sent_messages[1]["role"] == "user"
 
+    def test_chat_sends_identical_system_prompt_every_turn(
+        self, agent, mock_openai_response
+    ):
+        """The static system prompt leads every request so prompt caching can reuse it."""
+        from eu5_agent.prompts import SYSTEM_PROMPT
+
+        agent.client.chat.completions.create = Mock(
+            return_value=mock_openai_response("response")
+        )
+
+        agent.chat("How do estates work?")
+        agent.chat("I need a 15 year campaign roadmap with risks and fallback options")
+
+        for call in agent.client.chat.completions.create.call_args_list:
+            first = call.kwargs["messages"][0]
+            assert first == {"role": "system", "content": SYSTEM_PROMPT}
+
     def test_chat_preserves_raw_user_message_in_history(
-        self, temp_knowledge_base, monkeypatch, mock_openai_response
+        self, agent, mock_openai_response
     ):
         """Complex-mode instructions should not overwrite user content in history."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
-        agent = EU5Agent()
         agent.client.chat.completions.create = Mock(
             return_value=mock_openai_response("response")
         )
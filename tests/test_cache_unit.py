@@ -1,7 +1,7 @@
 import threading
 import time
 
-from eu5_agent.cache import LRUCache, clear_all_caches
+from eu5_agent.cache import LRUCache, SimilarityCache, clear_all_caches
 
 
 def _worker_set_get(cache: LRUCache, start_index: int, count: int):
@@ -32,3 +32,100 @@ def test_lru_cache_thread_safety():
     assert stats["size"] <= 50
     # Ensure some hits or misses occurred
     assert stats["hits"] + stats["misses"] > 0
+
+
+def test_lru_cache_eviction_order():
+    """get() and overwriting set() both refresh recency; oldest entry is evicted."""
+    cache = LRUCache(maxsize=3)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1  # a is now most recent
+    cache.set("b", 20)  # b refreshed and updated
+    cache.set("d", 4)  # evicts c, the least recently used
+
+    assert cache.get("c") is None
+    assert cache.get("a") == 1
+    assert cache.get("b") == 20
+    assert cache.get("d") == 4
+    assert cache.stats() == {"size": 3, "maxsize": 3, "hits": 4, "misses": 1}
+
+
+def test_lru_cache_delete():
+    """delete() removes one entry and reports whether it existed."""
+    cache = LRUCache(maxsize=3)
+    cache.set("a", None)
+    cache.set("b", 2)
+
+    assert cache.delete("a") is True
+    assert cache.delete("a") is False
+    assert cache.get("b") == 2
+    assert cache.stats()["size"] == 1
+
+
+def test_similarity_cache_matches_rephrasings():
+    """Queries hit when they differ only in case, punctuation, order or stopwords."""
+    cache = SimilarityCache(maxsize=4)
+    cache.set("EU5 France early game", "france")
+
+    assert cache.get("eu5 france early-game") == "france"
+    assert cache.get("EU5 early game in France") == "france"
+    assert cache.get("EU5 France early game", scope=5) is None  # other scope
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+
+
+def test_similarity_cache_misses_on_any_content_word_change():
+    """Swapping, adding or dropping a content word is a different query."""
+    cache = SimilarityCache(maxsize=4)
+    cache.set("EU5 best opening strategy for France in 1337 early game", "france")
+
+    assert cache.get("EU5 best opening strategy for England in 1337 early game") is None
+    assert cache.get("EU5 best opening strategy for France in 1444 early game") is None
+    assert cache.get("EU5 France early game strategy") is None
+    assert cache.get("EU5 best opening strategy for France in 1337 early game mistakes") is None
+    assert cache.stats()["hits"] == 0
+
+
+def test_similarity_cache_tokenizes_non_latin_queries():
+    """Cyrillic and CJK words are content words; topic-free queries are not cached."""
+    cache = SimilarityCache(maxsize=4)
+    cache.set("EU5 Франция стратегия", "france")
+    cache.set("EU5 ???", "nothing")
+
+    assert cache.get("стратегия, Франция") == "france"
+    assert cache.get("EU5 Англия экономика") is None
+    assert cache.get("EU5 法国 战略") is None
+    assert cache.get("EU5 ???") is None
+    assert cache.stats()["size"] == 1
+
+
+def test_lru_cache_ttl_expiry(monkeypatch):
+    """Entries older than ttl are dropped on lookup and counted as misses."""
+    now = [1000.0]
+    monkeypatch.setattr("eu5_agent.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=3, ttl=10)
+    cache.set("a", 1)
+
+    now[0] += 9
+    assert cache.get("a") == 1
+    cache.set("b", 2)  # b expires at 1019
+
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats() == {"size": 1, "maxsize": 3, "hits": 2, "misses": 1}
+
+
+def test_lru_cache_per_entry_ttl(monkeypatch):
+    """set(ttl=...) overrides the cache-wide ttl, including on a cache without one."""
+    now = [1000.0]
+    monkeypatch.setattr("eu5_agent.cache.time.monotonic", lambda: now[0])
+    cache = LRUCache(maxsize=3)
+    cache.set("short", 1, ttl=5)
+    cache.set("forever", 2)
+
+    now[0] += 6
+    assert cache.get("short") is None
+    assert cache.get("forever") == 2
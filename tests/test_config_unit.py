@@ -12,7 +12,13 @@ Tests cover:
 
 from unittest.mock import patch
 
-from eu5_agent.config import EU5Config, get_config, reset_config, load_dotenv_if_present
+from eu5_agent.config import (
+    EU5Config,
+    _load_dotenv_once,
+    get_config,
+    load_dotenv_if_present,
+    reset_config,
+)
 
 
 class TestLoadDotenv:
@@ -54,6 +60,28 @@ class TestLoadDotenv:
             result = load_dotenv_if_present()
             assert result is False
 
+    def test_dotenv_loaded_once_per_process(self):
+        """Later EU5Config() calls skip re-reading the .env file."""
+        _load_dotenv_once.cache_clear()
+        try:
+            with patch("eu5_agent.config.load_dotenv_if_present", return_value=False) as mock_load:
+                EU5Config()
+                EU5Config()
+
+            mock_load.assert_called_once_with()
+        finally:
+            _load_dotenv_once.cache_clear()
+
+    def test_reset_config_reloads_dotenv(self):
+        """reset_config() lets the next EU5Config() see a patched .env loader."""
+        EU5Config()  # the loader has already run once in this process
+
+        reset_config()
+        with patch("eu5_agent.config.load_dotenv_if_present", return_value=False) as mock_load:
+            EU5Config()
+
+        mock_load.assert_called_once_with()
+
 
 class TestEU5Config:
     """Tests for EU5Config class."""
@@ -168,6 +196,34 @@ class TestModelSpecificSettings:
         config = EU5Config()
         assert config.max_history_messages == 100
 
+    def test_max_tool_result_chars_default(self, clean_env):
+        """Test that max_tool_result_chars defaults to 20000."""
+        config = EU5Config()
+        assert config.max_tool_result_chars == 20000
+
+    def test_max_tool_result_chars_from_env(self, monkeypatch):
+        """Test that max_tool_result_chars reads from EU5_MAX_TOOL_RESULT_CHARS."""
+        monkeypatch.setenv("EU5_MAX_TOOL_RESULT_CHARS", "500")
+        config = EU5Config()
+        assert config.max_tool_result_chars == 500
+
+    def test_response_cache_disabled_by_default(self, clean_env):
+        """Test that the response cache is off unless enabled."""
+        config = EU5Config()
+        assert config.enable_response_cache is False
+
+    def test_response_cache_enabled_from_env(self, monkeypatch):
+        """Test that EU5_RESPONSE_CACHE=true enables the response cache."""
+        monkeypatch.setenv("EU5_RESPONSE_CACHE", "true")
+        config = EU5Config()
+        assert config.enable_response_cache is True
+
+    def test_response_cache_disabled_from_env(self, monkeypatch):
+        """Test that EU5_RESPONSE_CACHE=false disables the response cache."""
+        monkeypatch.setenv("EU5_RESPONSE_CACHE", "false")
+        config = EU5Config()
+        assert config.enable_response_cache is False
+
 
 class TestConfigValidation:
     """Tests for configuration validation."""
@@ -205,11 +261,8 @@ class TestConfigValidation:
         assert is_valid is True
         assert error is None
 
-    def test_validate_with_valid_config(self, monkeypatch, temp_knowledge_base):
+    def test_validate_with_valid_config(self, agent_env):
         """Test validation succeeds with valid configuration."""
-        monkeypatch.setenv("OPENAI_API_KEY", "sk-test-key")
-        monkeypatch.setenv("EU5_KNOWLEDGE_PATH", str(temp_knowledge_base))
-
         config = EU5Config()
         is_valid, error = config.validate()
 
@@ -9,12 +9,13 @@ Tests cover:
 - File content loading and parsing
 """
 
+import logging
 from unittest.mock import Mock, patch
 
 import pytest
 
 from eu5_agent.knowledge import EU5Knowledge
-from eu5_agent.cache import clear_all_caches
+from eu5_agent.cache import clear_all_caches, knowledge_cache
 
 
 class TestKnowledgeInitialization:
@@ -151,6 +152,77 @@ class TestKnowledgeRetrieval:
         assert "mechanics/economy_mechanics.md" in result1["file"]
         assert result1["size"] > 0
 
+    def test_preload_warms_cache(self, temp_knowledge_base, monkeypatch):
+        """Every mapped file present on disk is served from cache without reopening it."""
+        clear_all_caches()
+        kb = EU5Knowledge(str(temp_knowledge_base))
+
+        def failing_open(*args, **kwargs):
+            raise AssertionError("preloaded topic should not be read from disk")
+
+        monkeypatch.setattr("builtins.open", failing_open)
+
+        result = kb.get_knowledge("mechanics", "economy")
+        assert result["status"] == "success"
+        assert "Economy Mechanics" in result["content"]
+        assert kb.get_knowledge("strategy", "beginner_route")["status"] == "success"
+        assert kb.get_knowledge("nations", "england")["status"] == "success"
+
+    def test_warm_lookup_is_single_cache_hit(self, temp_knowledge_base):
+        """A warm lookup returns from one cache probe with no extra misses."""
+        clear_all_caches()
+        kb = EU5Knowledge(str(temp_knowledge_base))
+        before = knowledge_cache.stats()
+
+        assert kb.get_knowledge("mechanics", "economy")["status"] == "success"
+        after = knowledge_cache.stats()
+        assert after["hits"] == before["hits"] + 1
+        assert after["misses"] == before["misses"]
+
+    def test_preload_logs_missing_files(self, tmp_path, caplog):
+        """Files missing from a partial knowledge base are logged, not fatal."""
+        (tmp_path / "mechanics").mkdir()
+        (tmp_path / "mechanics" / "economy_mechanics.md").write_text("# Economy")
+
+        with caplog.at_level(logging.WARNING, logger="eu5_agent.knowledge"):
+            kb = EU5Knowledge(str(tmp_path))
+
+        assert kb.get_knowledge("mechanics", "economy")["status"] == "success"
+        assert "Could not preload mechanics/government" in caplog.text
+
+    def test_preload_disabled(self, temp_knowledge_base):
+        """preload=False leaves the cache cold."""
+        clear_all_caches()
+        EU5Knowledge(str(temp_knowledge_base), preload=False)
+
+        assert knowledge_cache.stats()["size"] == 0
+
+    def test_invalidate_rereads_edited_file(self, writable_knowledge_base):
+        """invalidate() drops cached content so the next lookup sees disk edits."""
+        kb = EU5Knowledge(str(writable_knowledge_base), preload=False)
+        assert "Economy Mechanics" in kb.get_knowledge("mechanics", "economy")["content"]
+
+        (writable_knowledge_base / "mechanics" / "economy_mechanics.md").write_text("# Revised")
+        assert "Economy Mechanics" in kb.get_knowledge("mechanics", "economy")["content"]
+
+        kb.invalidate()
+        assert kb.get_knowledge("mechanics", "economy")["content"] == "# Revised"
+
+    def test_get_knowledge_batch_deduplicates(self, temp_knowledge_base):
+        """Batch lookups return one result per distinct (category, subcategory)."""
+        kb = EU5Knowledge(str(temp_knowledge_base), preload=False)
+
+        with patch.object(kb, "get_knowledge", wraps=kb.get_knowledge) as spy:
+            results = kb.get_knowledge_batch([
+                ("mechanics", "economy"),
+                ("strategy", "beginner_route"),
+                ("mechanics", "economy"),
+            ])
+
+        assert spy.call_count == 2
+        assert set(results) == {("mechanics", "economy"), ("strategy", "beginner_route")}
+        assert results[("mechanics", "economy")]["status"] == "success"
+
     def test_get_knowledge_path_sensitive_cache(self, temp_knowledge_base, tmp_path):
         """Ensure cache keys include knowledge path so switching bases doesn't return stale data."""
         clear_all_caches()
@@ -260,12 +332,12 @@ class TestKnowledgeErrorHandling:
         assert result["status"] == "error"
         assert "Knowledge file not found" in result["error"]
 
-    def test_get_knowledge_unreadable_file(self, temp_knowledge_base):
+    def test_get_knowledge_unreadable_file(self, writable_knowledge_base):
         """Test error handling when file cannot be read."""
-        kb = EU5Knowledge(str(temp_knowledge_base))
+        kb = EU5Knowledge(str(writable_knowledge_base))
 
         # Create a file and make it unreadable (on Unix systems)
-        test_file = temp_knowledge_base / "mechanics" / "test.md"
+        test_file = writable_knowledge_base / "mechanics" / "test.md"
         test_file.write_text("test content")
 
         # Mock open to raise an exception
@@ -347,12 +419,12 @@ class TestKnowledgeContent:
         assert result["status"] == "success"
         assert result["size"] == len(result["content"])
 
-    def test_content_encoding(self, temp_knowledge_base):
+    def test_content_encoding(self, writable_knowledge_base):
         """Test that content handles UTF-8 encoding."""
-        kb = EU5Knowledge(str(temp_knowledge_base))
+        kb = EU5Knowledge(str(writable_knowledge_base))
 
         # Add a file with special characters
-        test_file = temp_knowledge_base / "mechanics" / "utf8_test.md"
+        test_file = writable_knowledge_base / "mechanics" / "utf8_test.md"
         test_content = "# Test\n\nSpecial chars: é, ñ, ü, 中文"
         test_file.write_text(test_content, encoding="utf-8")
 
@@ -363,12 +435,25 @@ class TestKnowledgeContent:
         assert "é" in result["content"]
         assert "中文" in result["content"]
 
-    def test_empty_file_handling(self, temp_knowledge_base):
+    def test_crlf_newlines_normalized(self, writable_knowledge_base):
+        """Test that CRLF line endings are returned as plain newlines."""
+        kb = EU5Knowledge(str(writable_knowledge_base))
+
+        crlf_file = writable_knowledge_base / "mechanics" / "crlf_test.md"
+        crlf_file.write_bytes(b"# Test\r\n\r\nWindows line endings\r\n")
+
+        kb.KNOWLEDGE_MAP["mechanics"]["crlf_test"] = "mechanics/crlf_test.md"
+        result = kb.get_knowledge("mechanics", "crlf_test")
+
+        assert result["status"] == "success"
+        assert result["content"] == "# Test\n\nWindows line endings\n"
+
+    def test_empty_file_handling(self, writable_knowledge_base):
         """Test handling of empty knowledge files."""
-        kb = EU5Knowledge(str(temp_knowledge_base))
+        kb = EU5Knowledge(str(writable_knowledge_base))
 
         # Create an empty file
-        empty_file = temp_knowledge_base / "mechanics" / "empty.md"
+        empty_file = writable_knowledge_base / "mechanics" / "empty.md"
         empty_file.write_text("")
 
         kb.KNOWLEDGE_MAP["mechanics"]["empty"] = "mechanics/empty.md"
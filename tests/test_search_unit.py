@@ -9,14 +9,41 @@ Tests cover:
 - Caching mechanism
 """
 
+import asyncio
+import sys
+import threading
 import warnings
+from types import SimpleNamespace
+from unittest.mock import Mock
+
 import pytest
-from unittest.mock import Mock, patch
 
-from eu5_agent.search import search_eu5_wiki, _ensure_eu5_context, _tavily_clients
+import requests
+from tavily import UsageLimitExceededError
+from tavily.errors import TimeoutError as TavilyTimeoutError
+
+from eu5_agent.search import (
+    search_eu5_wiki,
+    search_eu5_wiki_async,
+    search_eu5_wiki_comprehensive,
+    _ensure_eu5_context,
+    _tavily_clients,
+)
 from eu5_agent.cache import clear_all_caches
 
 
+def _tavily_client(**search_kwargs) -> SimpleNamespace:
+    """Stand-in TavilyClient; only its search() needs call tracking."""
+    return SimpleNamespace(search=Mock(**search_kwargs))
+
+
+def _patch_tavily(monkeypatch, client) -> Mock:
+    """Make tavily.TavilyClient return client; returns the stand-in class."""
+    client_cls = Mock(return_value=client)
+    monkeypatch.setattr("tavily.TavilyClient", client_cls)
+    return client_cls
+
+
 @pytest.fixture(autouse=True)
 def _clear_search_cache_fixture():
     # Ensure tests don't see cached results from other tests
@@ -71,13 +98,12 @@ class TestBasicSearch:
         monkeypatch.delenv("TAVILY_API_KEY", raising=False)
         _tavily_clients.clear()
 
-        mock_client = Mock()
-        mock_client.search = Mock(
+        mock_client = _tavily_client(
             return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]}
         )
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            results = search_eu5_wiki("France strategy", api_key="tvly-test-key")
+        _patch_tavily(monkeypatch, mock_client)
+        results = search_eu5_wiki("France strategy", api_key="tvly-test-key")
 
         assert len(results) == 1
         assert results[0]["title"] == "Result 1"
@@ -87,13 +113,12 @@ class TestBasicSearch:
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-env-key")
         _tavily_clients.clear()
 
-        mock_client = Mock()
-        mock_client.search = Mock(
+        mock_client = _tavily_client(
             return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]}
         )
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            results = search_eu5_wiki("England opening")
+        _patch_tavily(monkeypatch, mock_client)
+        results = search_eu5_wiki("England opening")
 
         assert len(results) == 1
 
@@ -122,11 +147,10 @@ class TestBasicSearch:
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
         _tavily_clients.clear()
 
-        mock_client = Mock()
-        mock_client.search = Mock(return_value={"results": []})
+        mock_client = _tavily_client(return_value={"results": []})
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            search_eu5_wiki("France strategy")
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("France strategy")
 
         # Verify the client was called with prefixed query
         call_args = mock_client.search.call_args
@@ -137,8 +161,7 @@ class TestBasicSearch:
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
         _tavily_clients.clear()
 
-        mock_client = Mock()
-        mock_client.search = Mock(
+        mock_client = _tavily_client(
             return_value={
                 "results": [
                     {"title": f"Result {i}", "url": f"url{i}", "content": f"test{i}"}
@@ -147,8 +170,8 @@ class TestBasicSearch:
             }
         )
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            results = search_eu5_wiki("test", max_results=5)
+        _patch_tavily(monkeypatch, mock_client)
+        results = search_eu5_wiki("test", max_results=5)
 
         assert len(results) == 5
 
@@ -157,11 +180,10 @@ class TestBasicSearch:
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
         _tavily_clients.clear()
 
-        mock_client = Mock()
-        mock_client.search = Mock(return_value={"results": []})
+        mock_client = _tavily_client(return_value={"results": []})
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            search_eu5_wiki("test query")
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("test query")
 
         call_args = mock_client.search.call_args
         domains = call_args[1]["include_domains"]
@@ -174,11 +196,10 @@ class TestBasicSearch:
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
         _tavily_clients.clear()
 
-        mock_client = Mock()
-        mock_client.search = Mock(return_value={"results": []})
+        mock_client = _tavily_client(return_value={"results": []})
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            search_eu5_wiki("test query")
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("test query")
 
         call_args = mock_client.search.call_args
         assert call_args[1]["search_depth"] == "basic"
@@ -188,18 +209,169 @@ class TestBasicSearch:
         monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
         clear_all_caches()
 
-        mock_client = Mock()
         # simulate results
-        mock_client.search = Mock(return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]})
+        mock_client = _tavily_client(return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]})
+
+        _patch_tavily(monkeypatch, mock_client)
+        # First search should call the client
+        results1 = search_eu5_wiki("France strategy", api_key="tvly-test-key")
+        assert len(results1) == 1
+
+        # Second search with same parameters should be served from cache
+        results2 = search_eu5_wiki("France strategy", api_key="tvly-test-key")
+        assert len(results2) == 1
+
+        # Ensure the underlying client.search was only called once
+        assert mock_client.search.call_count == 1
+
+    def test_search_cache_ignores_case_and_spacing(self, monkeypatch):
+        """Queries differing only in case or whitespace share the exact-match entry."""
+        monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
+
+        mock_client = _tavily_client(return_value={"results": []})
+
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("France strategy", api_key="tvly-test-key")
+        search_eu5_wiki("  france   STRATEGY ", api_key="tvly-test-key")
+        assert mock_client.search.call_count == 1
+
+    def test_search_reuses_client_per_api_key(self, monkeypatch):
+        """One TavilyClient is built per API key and shared across searches."""
+        mock_client = _tavily_client(return_value={"results": []})
+
+        client_cls = _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("France strategy", api_key="tvly-test-key")
+        search_eu5_wiki("Ottoman strategy", api_key="tvly-test-key")
+        assert client_cls.call_count == 1
+
+        search_eu5_wiki("Ottoman strategy", api_key="tvly-other-key")
+        assert client_cls.call_count == 1  # served from the result cache
+        search_eu5_wiki("Castile strategy", api_key="tvly-other-key")
+        assert client_cls.call_count == 2
+
+    def test_search_async_runs_searches_concurrently(self, monkeypatch):
+        """Awaited searches overlap instead of running one after another."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def search(**kwargs):
+            barrier.wait()  # only passes once both searches are in flight
+            return {"results": [{"title": kwargs["query"], "url": "url", "content": "c"}]}
+
+        mock_client = _tavily_client(side_effect=search)
+
+        async def run():
+            return await asyncio.gather(
+                search_eu5_wiki_async("France opening", api_key="tvly-test-key"),
+                search_eu5_wiki_async("Ottoman opening", api_key="tvly-test-key"),
+            )
+
+        _patch_tavily(monkeypatch, mock_client)
+        france, ottoman = asyncio.run(run())
+
+        assert france[0]["title"] == "EU5 France opening"
+        assert ottoman[0]["title"] == "EU5 Ottoman opening"
+
+    def test_search_failures_cached_briefly(self, monkeypatch):
+        """A failed or empty search is not retried upstream until the negative TTL passes."""
+        now = [1000.0]
+        monkeypatch.setattr("eu5_agent.cache.time.monotonic", lambda: now[0])
+
+        mock_client = _tavily_client(side_effect=[RuntimeError("quota exceeded"), {"results": []}])
+
+        _patch_tavily(monkeypatch, mock_client)
+        with pytest.warns(UserWarning, match="quota exceeded"):
+            assert search_eu5_wiki("France strategy", api_key="tvly-test-key") == []
+        assert search_eu5_wiki("France strategy", api_key="tvly-test-key") == []
+        assert mock_client.search.call_count == 1
+
+        now[0] += 61
+        assert search_eu5_wiki("France strategy", api_key="tvly-test-key") == []
+        assert search_eu5_wiki("France strategy", api_key="tvly-test-key") == []
+        assert mock_client.search.call_count == 2
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (UsageLimitExceededError("Usage limit exceeded"), "usage limit exceeded"),
+            (TavilyTimeoutError(60), "network error: Request timed out after 60 seconds"),
+            (requests.ConnectionError("connection refused"), "network error: connection refused"),
+            (ValueError("unexpected payload"), "Tavily search error: unexpected payload"),
+        ],
+        ids=["usage-limit", "tavily-timeout", "connection-error", "unknown"],
+    )
+    def test_search_error_warning_names_failure(self, monkeypatch, error, expected):
+        """Quota, network and unknown failures produce distinguishable warnings."""
+        mock_client = _tavily_client(side_effect=error)
+
+        _patch_tavily(monkeypatch, mock_client)
+        with pytest.warns(UserWarning, match=expected):
+            assert search_eu5_wiki("France strategy", api_key="tvly-test-key") == []
+
+    def test_search_error_without_tavily_errors_module(self, monkeypatch):
+        """A tavily-python without tavily.errors still warns and returns no results."""
+        monkeypatch.setitem(sys.modules, "tavily.errors", None)  # import now fails
+        mock_client = _tavily_client(side_effect=ConnectionResetError("reset by peer"))
+
+        _patch_tavily(monkeypatch, mock_client)
+        with pytest.warns(UserWarning, match="network error: reset by peer"):
+            assert search_eu5_wiki("France strategy", api_key="tvly-test-key") == []
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (UsageLimitExceededError("Usage limit exceeded"), "usage limit exceeded"),
+            (TavilyTimeoutError(60), "network error: Request timed out after 60 seconds"),
+            (ValueError("unexpected payload"), "Tavily comprehensive search error: unexpected payload"),
+        ],
+        ids=["usage-limit", "tavily-timeout", "unknown"],
+    )
+    def test_comprehensive_search_error_warning_names_failure(self, monkeypatch, error, expected):
+        """The comprehensive search reports failures by type too."""
+        mock_client = _tavily_client(side_effect=error)
+
+        _patch_tavily(monkeypatch, mock_client)
+        with pytest.warns(UserWarning, match=expected):
+            assert search_eu5_wiki_comprehensive("France strategy", api_key="tvly-test-key") == []
+
+    def test_search_rephrased_query_served_from_similarity_cache(self, monkeypatch):
+        """Rephrased queries reuse earlier results; other topics do not."""
+        monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
+
+        mock_client = _tavily_client(return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]})
+
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("France early game", api_key="tvly-test-key")
+        search_eu5_wiki("early-game in france", api_key="tvly-test-key")
+        assert mock_client.search.call_count == 1
+
+        search_eu5_wiki("Ottoman late game", api_key="tvly-test-key")
+        assert mock_client.search.call_count == 2
+
+        # A different result count is a different request
+        search_eu5_wiki("France early game", max_results=5, api_key="tvly-test-key")
+        assert mock_client.search.call_count == 3
+
+    def test_search_entity_swap_not_served_from_similarity_cache(self, monkeypatch):
+        """Queries naming a different nation fetch their own results."""
+        monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
+
+        mock_client = _tavily_client(return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]})
+
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("EU5 best opening strategy for France in 1337 early game", api_key="tvly-test-key")
+        search_eu5_wiki("EU5 best opening strategy for England in 1337 early game", api_key="tvly-test-key")
+        assert mock_client.search.call_count == 2
+
+    def test_search_non_latin_queries_not_merged(self, monkeypatch):
+        """Queries on different topics in Cyrillic or punctuation only each go upstream."""
+        monkeypatch.setenv("TAVILY_API_KEY", "tvly-test-key")
 
-        with patch("tavily.TavilyClient", return_value=mock_client):
-            # First search should call the client
-            results1 = search_eu5_wiki("France strategy", api_key="tvly-test-key")
-            assert len(results1) == 1
+        mock_client = _tavily_client(return_value={"results": [{"title": "Result 1", "url": "url1", "content": "test"}]})
 
-            # Second search with same parameters should be served from cache
-            results2 = search_eu5_wiki("France strategy", api_key="tvly-test-key")
-            assert len(results2) == 1
+        _patch_tavily(monkeypatch, mock_client)
+        search_eu5_wiki("EU5 Франция стратегия", api_key="tvly-test-key")
+        search_eu5_wiki("EU5 Англия экономика", api_key="tvly-test-key")
+        assert mock_client.search.call_count == 2
 
-            # Ensure the underlying client.search was only called once
-            assert mock_client.search.call_count == 1
+        search_eu5_wiki("???", api_key="tvly-test-key")
+        assert mock_client.search.call_count == 3